@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+In-memory conversion API
+
+    from progparser.api import convert, load_table
+
+    table = load_table('reg_table.txt')
+    outs = convert(table, ['a.ini', 'b.ini'], 'ini', 'hex')
+    # outs = {'a.pat': '0000...', 'b.pat': '0000...'}
+
+No file is written unless a DirSink/ZipSink is given, and the parsed 
+table can be reused across calls. Warnings of the last call are kept in
+'table.diag'.
+"""
+
+import io
+import os
+from pathlib import Path
+
+from progparser.progparser import Pat, PatternList
+from progparser.utils.sink import DirSink, MemorySink, ZipSink
+
+__all__ = ['load_table', 'load_patterns', 'convert', 
+           'DirSink', 'MemorySink', 'ZipSink']
+
+TABLE_TYPES = {'.txt': 'txt', '.xlsx': 'xlsx', '.db': 'db', '.sqlite': 'sqlite'}
+OUT_EXTS = {'ini': '.ini', 'hex': '.pat', 'words': '', 'xlsx': '.xlsx'}
+
+
+def load_table(table_fp, table_type: str=None, debug_mode: set=None) -> PatternList:
+    """Load the reference table (type is guessed by the file extension)"""
+    if table_type is None:
+        try:
+            table_type = TABLE_TYPES[Path(table_fp).suffix.lower()]
+        except KeyError:
+            raise ValueError(f"unknown register table type ({table_fp})")
+    return PatternList(str(table_fp), table_type, debug_mode)
+
+
+def load_patterns(table: PatternList, patterns, in_fmt: str) -> list:
+    """Load patterns without changing the pattern list of the table
+
+    patterns:
+        - a list of file paths, or
+        - a dict {pat_name: text/bytes/regs}, a regs dict is used as is, or
+        - Pat objects
+    For excel input, each item is a workbook (path or bytes) and all 
+    pattern columns in it are loaded. Warnings of earlier calls are 
+    cleared from 'table.diag'.
+    """
+    table.diag.clear()
+    if isinstance(patterns, (str, os.PathLike)):
+        patterns = [patterns]
+
+    items = patterns.items() if isinstance(patterns, dict) else patterns
+
+    pats = []
+    for item in items:
+        if isinstance(item, Pat):
+            pats.append(item)
+            continue
+
+        if isinstance(item, tuple):
+            pat_name, src = item
+        else:
+            pat_name, src = None, item
+
+        if isinstance(src, dict):
+            pats.append(Pat(pat_name, {name.upper(): str(value) 
+                                       for name, value in src.items()}))
+        elif in_fmt == 'xlsx':
+            if isinstance(src, (bytes, bytearray)):
+                src = io.BytesIO(src)
+            pats.extend(table.xlsx_load(src, is_batch=True))
+        else:
+            if isinstance(src, (str, bytes, bytearray)) and pat_name is not None:
+                if isinstance(src, (bytes, bytearray)):
+                    src = src.decode()
+                lines = io.StringIO(src)
+            else:
+                pat_name = os.path.splitext(os.path.basename(src))[0]
+                lines = None
+
+            if in_fmt == 'ini':
+                pats.append(table.ini_load(lines, pat_name) if lines 
+                            else table.ini_read(src))
+            elif in_fmt == 'hex':
+                pats.append(table.hex_load(lines, pat_name) if lines
+                            else table.hex_read(src))
+            else:
+                raise ValueError(f"unsupported input format ({in_fmt})")
+
+    return pats
+
+
+def convert(table, patterns, in_fmt: str, out_fmt: str, sink=None, 
+            xlsx_ref=None, is_init=False, rsv_max=None):
+    """Convert patterns in memory
+
+    table:   PatternList (reusable) or the path of the reference table
+    in_fmt:  ini/hex/xlsx
+    out_fmt: ini (str), hex (str), words (array of hex image), xlsx (bytes)
+    sink:    MemorySink (default)/DirSink/ZipSink
+
+    Return {out_name: data} for the memory sink, or the list of written 
+    output names for other sinks.
+    """
+    if not isinstance(table, PatternList):
+        table = load_table(table)
+
+    if out_fmt not in OUT_EXTS:
+        raise ValueError(f"unsupported output format ({out_fmt})")
+
+    pats = load_patterns(table, patterns, in_fmt)
+    out_sink = MemorySink() if sink is None else sink
+
+    if out_fmt == 'xlsx':
+        if xlsx_ref is None:
+            raise TypeError("need an excel register table when output excel file")
+        wb = table.xlsx_render(xlsx_ref, pats, is_init)
+        buf = io.BytesIO()
+        wb.save(buf)
+        wb.close()
+        out_sink.write('register.xlsx', buf.getvalue())
+    else:
+        addr_map = list(table.addr_map(rsv_max))
+        for pat in pats:
+            if out_fmt == 'ini':
+                data = table.ini_render(pat)
+            elif out_fmt == 'hex':
+                data = table.hex_render(pat, addr_map)
+            else:
+                data = table.hex_words(pat, addr_map)
+            out_sink.write(pat.name + OUT_EXTS[out_fmt], data)
+
+    if sink is None:
+        return out_sink.outputs
+    return list(out_sink.outputs.keys())
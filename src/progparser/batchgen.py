@@ -5,8 +5,9 @@
 # Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
 #
 import argparse
-import copy
 import glob
+import itertools
+import json
 import os
 import shutil
 import sys
@@ -15,9 +16,14 @@ from pathlib import Path
 
 from progparser import __version__
 from progparser.progparser import Pat, PatternList
+from progparser.utils.dedup import Deduper
+from progparser.utils.ini_cache import load_ini, read_ini
 
 PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
+CHUNK_SIZE = 1000
+MANIFEST = 'batchg_manifest.json'
+
 ### Class Definition ###
 
 class BatchPatGen(PatternList):
@@ -25,64 +31,116 @@ class BatchPatGen(PatternList):
 
     def __init__(self, table_fp: str, table_type: str, debug_mode: set=None):
         super().__init__(table_fp, table_type, debug_mode)
+        self.deduper = None
+        self.sequence = None
+
+    def plan_pats(self, test_plan):
+        """Iterate (pat_name, mod_regs) of a test plan (SWEEP or pat_gen)"""  #{{{
+        if (sweep := getattr(test_plan, 'SWEEP', None)) is not None:
+            return iter(sweep.bind(self))
+        return iter(test_plan.pat_gen().items())
+    #}}}
 
-    def gen_group_pat(self, test_plan, bat_dir, only_type: str):
-        """Pattern parser for INI format"""  #{{{
-        ref_dir = Path(test_plan.REF_DIR)
-        ref_regs = self.read_ini(ref_dir / test_plan.REF_INI)
-        mod_pat_list = test_plan.pat_gen()
-
-        ## Pattern generate
+    @staticmethod
+    def plan_count(test_plan) -> tuple:
+        """Get (count, estimate) of a test plan without pattern dump"""  #{{{
+        if (sweep := getattr(test_plan, 'SWEEP', None)) is not None:
+            return sweep.count(), sweep.estimate()
+        pat_cnt = len(test_plan.pat_gen())
+        return pat_cnt, pat_cnt
+    #}}}
 
-        self.pat_list = []
-        for pat_name, mod_regs in mod_pat_list.items():
-            pat_regs = copy.deepcopy(ref_regs)
-            for reg_name, value in mod_regs.items():
-                pat_regs[reg_name.upper()] = str(value)
-            self.pat_list.append(Pat(pat_name, pat_regs))
-
-            if 'p' in self.debug_mode:
-                print(f"=== INI READ ({pat_name}) ===")
-                for item in pat_regs.items():
-                    print(item)
-                print()
+    @staticmethod
+    def plan_info(test_plan) -> dict:
+        """Get the generation mode/strength of a test plan"""  #{{{
+        if (sweep := getattr(test_plan, 'SWEEP', None)) is not None:
+            info = {'mode': sweep.mode, 'strength': sweep.strength}
+            if sweep.mode == 'random':
+                info['seed'] = sweep.seed
+            return info
+        return {'mode': 'pat_gen', 'strength': None}
+    #}}}
 
-        ## Dump pattern
+    def gen_group_pat(self, test_plan, bat_dir, only_type: str, is_dedup: bool=False,
+                      is_delta: bool=False, is_reorder: bool=False):
+        """Pattern parser for INI format"""  #{{{
+        self.deduper = Deduper() if is_dedup else None
+        self.sequence = [] if is_delta else None
+        last_words = None
+        ref_dir = Path(test_plan.REF_DIR)
+        ref_regs = read_ini(ref_dir / test_plan.REF_INI)
+        mod_pats = self.plan_pats(test_plan)
 
         pat_dir = Path('progp_out')
         if pat_dir.exists():
             shutil.rmtree(pat_dir) if pat_dir.is_dir() else pat_dir.unlink()
         pat_dir.mkdir()
-        self.ini_dump(pat_dir, info_dump=False)
-        self.hex_dump(pat_dir, info_dump=False)
 
-        if only_type is None:
-            out_ini_fp = Path(test_plan.OUT_PAT).stem + '.ini'
-            for pat_name in mod_pat_list.keys():
-                out_dir = bat_dir / pat_name
-                if out_dir.exists():
-                    shutil.rmtree(out_dir) if out_dir.is_dir() else out_dir.unlink()
-                shutil.copytree(ref_dir, out_dir, symlinks=True)
-                Path(out_dir, test_plan.REF_INI).unlink()
-                shutil.copy(pat_dir / f"{pat_name}.ini", out_dir / out_ini_fp)
-                shutil.copy(pat_dir / f"{pat_name}.pat", out_dir / test_plan.OUT_PAT)
-        else:
-            if only_type == 'ini':
-                pat_paths = pat_dir.glob('*.ini')
-            else:
-                pat_paths = pat_dir.glob('*.pat')
+        ## Pattern generate & dump (by chunk)
+
+        pat_cnt = 0
+        while len(chunk := list(itertools.islice(mod_pats, CHUNK_SIZE))):
+            self.pat_list = []
+            for pat_name, mod_regs in chunk:
+                pat_regs = dict(ref_regs)
+                for reg_name, value in mod_regs.items():
+                    pat_regs[reg_name.upper()] = str(value)
+                self.pat_list.append(Pat(pat_name, pat_regs))
+
+                if 'p' in self.debug_mode:
+                    print(f"=== INI READ ({pat_name}) ===")
+                    for item in pat_regs.items():
+                        print(item)
+                    print()
+
+            if self.deduper is not None:
+                self.dedup_pattern(self.deduper)
+
+            self.ini_dump(pat_dir, info_dump=False)
+            self.hex_dump(pat_dir, info_dump=False)
+            if is_delta:
+                last_words = self.seq_dump(pat_dir, info_dump=False, is_delta=True,
+                                           is_reorder=is_reorder, base_words=last_words)
+                self.sequence.extend([pat.name for pat in self.pat_list])
+
+            with self.open_sink(bat_dir) as sink:
+                if only_type is None:
+                    out_ini_fp = Path(test_plan.OUT_PAT).stem + '.ini'
+                    out_seq_fp = Path(test_plan.OUT_PAT).stem + '.seq'
+                    for pat in self.pat_list:
+                        out_dir = bat_dir / pat.name
+                        if out_dir.exists():
+                            shutil.rmtree(out_dir) if out_dir.is_dir() else out_dir.unlink()
+                        shutil.copytree(ref_dir, out_dir, symlinks=True)
+                        Path(out_dir, test_plan.REF_INI).unlink()
+                        sink.copy(pat_dir / f"{pat.name}.ini", Path(pat.name, out_ini_fp))
+                        sink.copy(pat_dir / f"{pat.name}.pat", Path(pat.name, test_plan.OUT_PAT))
+                        if is_delta:
+                            sink.copy(pat_dir / f"{pat.name}.seq", Path(pat.name, out_seq_fp))
+                else:
+                    pat_ext = '.ini' if only_type == 'ini' else '.pat'
+                    for pat in self.pat_list:
+                        sink.copy(pat_dir / f"{pat.name}{pat_ext}", pat.name + pat_ext)
+                        if is_delta:
+                            sink.copy(pat_dir / f"{pat.name}.seq", pat.name + '.seq')
 
-            for pat in pat_paths:
-                shutil.copy(pat, bat_dir)
+            for pat in self.pat_list:
+                for pat_ext in ('.ini', '.pat', '.seq'):
+                    Path(pat_dir, pat.name + pat_ext).unlink(missing_ok=True)
+            pat_cnt += len(self.pat_list)
 
         shutil.rmtree(pat_dir)
         print(f"[INFO] {test_plan.__name__} generated.")
+        return pat_cnt
     #}}}
 
-    def upd_group_pat(self, test_plan, bat_dir, only_type: str):
+    def upd_group_pat(self, test_plan, bat_dir, only_type: str, is_dedup: bool=False,
+                      is_delta: bool=False, is_reorder: bool=False):
         """Parse existed INI pattern and update"""  #{{{
+        self.deduper = Deduper() if is_dedup else None
+        self.sequence = [] if is_delta else None
         ref_dir = Path(test_plan.REF_DIR)
-        mod_pat_list = test_plan.pat_gen()
+        mod_pat_list = dict(self.plan_pats(test_plan))
 
         ## Pattern generate
 
@@ -93,7 +151,7 @@ class BatchPatGen(PatternList):
                 pat_name = Path(ref_fp).parts[1] if only_type is None else Path(ref_fp).stem
                 if pat_name in mod_pat_list:
                     ref_list.append(ref_fp)
-                    pat_regs = self.read_ini(ref_fp)
+                    pat_regs = load_ini(ref_fp)
                     for reg_name, value in mod_pat_list[pat_name].items():
                         pat_regs[reg_name.upper()] = str(value)
                     self.pat_list.append(Pat(pat_name, pat_regs))
@@ -101,6 +159,11 @@ class BatchPatGen(PatternList):
             print('[INFO] \'Only hex type\' doesn\'t support in group update mode.')
             exit(0)
 
+        if self.deduper is not None:
+            self.dedup_pattern(self.deduper)
+            ref_list = [ref_fp for ref_fp in ref_list
+                        if Path(ref_fp).parts[1] not in self.deduper.alias]
+
         ## Dump pattern
 
         pat_dir = Path('progp_out')
@@ -109,59 +172,39 @@ class BatchPatGen(PatternList):
         pat_dir.mkdir()
         self.ini_dump(pat_dir, info_dump=False)
         self.hex_dump(pat_dir, info_dump=False)
-
-        if only_type is None:
-            out_ini_fp = Path(test_plan.OUT_PAT).stem + '.ini'
-            for ref_fp in ref_list:
-                pat_name = Path(ref_fp).parts[1]
-                out_dir = bat_dir / pat_name
-                if out_dir.exists():
-                    shutil.rmtree(out_dir) if out_dir.is_dir() else out_dir.unlink()
-                shutil.copytree(Path(ref_fp).parent, out_dir, symlinks=True)
-                Path(out_dir, test_plan.REF_INI).unlink()
-                shutil.copy(pat_dir / f"{pat_name}.ini", out_dir / out_ini_fp)
-                shutil.copy(pat_dir / f"{pat_name}.pat", out_dir / test_plan.OUT_PAT)
-        else:
-            if only_type == 'ini':
-                pat_paths = pat_dir.glob('*.ini')
+        if is_delta:
+            self.seq_dump(pat_dir, info_dump=False, is_delta=True, is_reorder=is_reorder)
+            self.sequence = [pat.name for pat in self.pat_list]
+
+        with self.open_sink(bat_dir) as sink:
+            if only_type is None:
+                out_ini_fp = Path(test_plan.OUT_PAT).stem + '.ini'
+                out_seq_fp = Path(test_plan.OUT_PAT).stem + '.seq'
+                for ref_fp in ref_list:
+                    pat_name = Path(ref_fp).parts[1]
+                    out_dir = bat_dir / pat_name
+                    if out_dir.exists():
+                        shutil.rmtree(out_dir) if out_dir.is_dir() else out_dir.unlink()
+                    shutil.copytree(Path(ref_fp).parent, out_dir, symlinks=True)
+                    Path(out_dir, test_plan.REF_INI).unlink()
+                    sink.copy(pat_dir / f"{pat_name}.ini", Path(pat_name, out_ini_fp))
+                    sink.copy(pat_dir / f"{pat_name}.pat", Path(pat_name, test_plan.OUT_PAT))
+                    if is_delta:
+                        sink.copy(pat_dir / f"{pat_name}.seq", Path(pat_name, out_seq_fp))
             else:
-                pat_paths = pat_dir.glob('*.pat')
+                if only_type == 'ini':
+                    pat_paths = pat_dir.glob('*.ini')
+                else:
+                    pat_paths = pat_dir.glob('*.pat')
+                if is_delta:
+                    pat_paths = [*pat_paths, *pat_dir.glob('*.seq')]
 
-            for pat in pat_paths:
-                shutil.copy(pat, bat_dir)
+                for pat in pat_paths:
+                    sink.copy(pat, pat.name)
 
         shutil.rmtree(pat_dir)
         print(f"[INFO] {test_plan.__name__} generated.")
-    #}}}
-
-    def read_ini(self, ref_ini) -> dict:
-        """Read INI setting"""  #{{{
-        ref_regs = {}
-        with open(ref_ini, 'r') as f:
-            line = f.readline()
-            line_no = 1
-            while line:
-                if line.startswith('['):
-                    pass
-                elif line.startswith('#'):
-                    pass
-                else:
-                    toks = line.split()
-                    try:
-                        if len(toks) and toks[1] == '=':
-                            str_ = ' '.join(toks[2:])
-                            ref_regs[toks[0].upper()] = str_.split('#')[0].strip("\"\' ")
-                    except Exception as e:
-                        print('-' * 60)
-                        print("INIRegParseError: (line: {})".format(line_no))
-                        print("syntax of register descriptor:")
-                        print("  '<reg_name> = <value> [comment]'")
-                        print('-' * 60)
-                        raise e
-                line = f.readline()
-                line_no += 1
-
-        return ref_regs
+        return len(self.pat_list)
     #}}}
 #}}}
 
@@ -191,6 +234,20 @@ def main():
                                     help="custom dump directory")
     parser.add_argument('--only', dest='only_type', metavar='<type>', choices=['ini', 'hex'],
                                     help="input format (choices: ini/hex/xlsx)") 
+    parser.add_argument('--dedup', dest='is_dedup', action='store_true',
+                                    help="generate unique patterns only (alias map in the manifest)")
+    parser.add_argument('--delta', dest='is_delta', action='store_true',
+                                    help="dump write sequences of the delta to the previous pattern")
+    parser.add_argument('--reorder', dest='is_reorder', action='store_true',
+                                    help=textwrap.dedent(f"""\
+                                    reorder patterns to minimize the delta (with --delta),
+                                    patterns are reordered within each chunk of {CHUNK_SIZE}"""))
+    parser.add_argument('--io-jobs', dest='io_jobs', metavar='<num>', type=int, default=0,
+                                    help="write/copy pattern files by threads (default: 0, synchronous)")
+    parser.add_argument('--fsync', dest='is_fsync', action='store_true',
+                                    help="fsync each written pattern file")
+    parser.add_argument('--count', dest='is_count', action='store_true',
+                                    help="print pattern count of test plans and exit")
 
     args, args_dbg = parser.parse_known_args()
 
@@ -207,6 +264,10 @@ def main():
     except Exception:
         pass
 
+    if args.is_reorder and not args.is_delta:
+        print("[Error] reorder mode can't be used without the delta mode.")
+        exit(1)
+
     ## Import batchgen define file
 
     sys.path.insert(0, '')
@@ -216,6 +277,13 @@ def main():
         print("ModuleNotFoundError: Please create 'batchg_define' module in current directory")
         exit(1)
 
+    if args.is_count:
+        for test_plan, is_active in bd.pat_grp:
+            if is_active:
+                pat_cnt, est_cnt = BatchPatGen.plan_count(test_plan)
+                print(f"{test_plan.__name__}: {pat_cnt} (estimate: {est_cnt})")
+        return 0
+
     ## Parser register table
 
     if args.txt_table_fp:
@@ -225,6 +293,9 @@ def main():
     elif args.xlsx_table_fp2:
         batch_gen = BatchPatGen(args.xlsx_table_fp2, 'xlsx', debug_mode)
 
+    batch_gen.io_jobs = args.io_jobs
+    batch_gen.is_fsync = args.is_fsync
+
     if args.cus_dir is not None:
         bat_dir = Path(args.cus_dir)
     else:
@@ -234,16 +305,33 @@ def main():
 
     bat_dir.mkdir()
 
+    gen_opts = {'is_dedup': args.is_dedup, 'is_delta': args.is_delta,
+                'is_reorder': args.is_reorder}
+
+    manifest = {}
     for test_plan, is_active in bd.pat_grp:
         if is_active:
             try:
                 if test_plan.UPD_MOD is True:
-                    batch_gen.upd_group_pat(test_plan, bat_dir, args.only_type)
+                    pat_cnt = batch_gen.upd_group_pat(test_plan, bat_dir, args.only_type,
+                                                      **gen_opts)
                 else:
-                    batch_gen.gen_group_pat(test_plan, bat_dir, args.only_type)
+                    pat_cnt = batch_gen.gen_group_pat(test_plan, bat_dir, args.only_type,
+                                                      **gen_opts)
             except AttributeError: 
-                batch_gen.gen_group_pat(test_plan, bat_dir, args.only_type)
-
+                pat_cnt = batch_gen.gen_group_pat(test_plan, bat_dir, args.only_type,
+                                                  **gen_opts)
+            manifest[test_plan.__name__] = {'count': pat_cnt,
+                                            **BatchPatGen.plan_info(test_plan)}
+            if batch_gen.deduper is not None:
+                manifest[test_plan.__name__]['alias'] = batch_gen.deduper.alias
+            if batch_gen.sequence is not None:
+                manifest[test_plan.__name__]['sequence'] = batch_gen.sequence
+
+    with open(bat_dir / MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    batch_gen.diag.summary()
 
 #}}}
 
@@ -5,7 +5,6 @@
 # Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
 #
 import argparse
-import copy
 import glob
 import os
 import shutil
@@ -15,6 +14,7 @@ from pathlib import Path
 
 from progparser import __version__
 from progparser.progparser import Pat, PatternList
+from progparser.utils.ini_cache import read_ini
 
 PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
@@ -29,14 +29,14 @@ class BatchPatRun(PatternList):
     def run_group_pat(self, test_plan, bat_dir, only_type: str) -> bool:
         """Pattern parser for INI format and run"""  #{{{
         ref_dir = Path(test_plan.REF_DIR)
-        ref_regs = self.read_ini(ref_dir / test_plan.REF_INI)
+        ref_regs = read_ini(ref_dir / test_plan.REF_INI)
         mod_pat_list = test_plan.pat_gen()
 
         ## Pattern generate
 
         self.pat_list = []
         for pat_name, mod_regs in mod_pat_list.items():
-            pat_regs = copy.deepcopy(ref_regs)
+            pat_regs = dict(ref_regs)
             for reg_name, value in mod_regs.items():
                 pat_regs[reg_name.upper()] = str(value)
             self.pat_list.append(Pat(pat_name, pat_regs))
@@ -67,36 +67,6 @@ class BatchPatRun(PatternList):
             if not is_pass:
                 shutil.copytree(cur_dir, err_dir / pat_name)
     #}}}
-
-    def read_ini(self, ref_ini) -> dict:
-        """Read INI setting"""  #{{{
-        ref_regs = {}
-        with open(ref_ini, 'r') as f:
-            line = f.readline()
-            line_no = 1
-            while line:
-                if line.startswith('['):
-                    pass
-                elif line.startswith('#'):
-                    pass
-                else:
-                    toks = line.split()
-                    try:
-                        if len(toks) and toks[1] == '=':
-                            str_ = ' '.join(toks[2:])
-                            ref_regs[toks[0].upper()] = str_.split('#')[0].strip("\"\' ")
-                    except Exception as e:
-                        print('-' * 60)
-                        print("INIRegParseError: (line: {})".format(line_no))
-                        print("syntax of register descriptor:")
-                        print("  '<reg_name> = <value> [comment]'")
-                        print('-' * 60)
-                        raise e
-                line = f.readline()
-                line_no += 1
-
-        return ref_regs
-    #}}}
 #}}}
 
 ### Main Function ###
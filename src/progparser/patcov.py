@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+"""
+Register value coverage of a pattern corpus
+"""
+import argparse
+import json
+import sys
+import textwrap
+from array import array
+from pathlib import Path
+
+from progparser import __version__
+from progparser.patverify import load_corpus
+from progparser.progparser import PatternList
+
+PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
+
+### Function ###
+
+def field_coverage(table: PatternList, corpus: dict) -> list:
+    """Get the coverage of all fields over the corpus
+
+    Words of all patterns are packed to one flat array and sliced per
+    address, so each address column is scanned once for the bit toggle
+    masks and once for the distinct words. Field statistics are taken
+    from the distinct words only.
+    """  #{{{
+    addrs = table.hex_addrs(list(table.addr_map(rsv_max=0)))
+    addr_num = len(addrs)
+    flat = array('I', b''.join(words for words, _ in corpus.values()))
+
+    cov_list = []
+    for col_idx, addr in enumerate(addrs):
+        if not (fields := table.field_index.get(addr)):
+            continue
+        col = flat[col_idx::addr_num]
+        if not len(col):
+            continue
+
+        or_word = and_word = col[0]
+        for word in col:
+            or_word |= word
+            and_word &= word
+        uniq_words = set(col)
+
+        for reg, lsb, mask, _ in fields:
+            if reg.name == 'RESERVED':
+                continue
+            width = reg.msb - reg.lsb + 1
+            vals = {(word >> lsb) & mask for word in uniq_words}
+            seen_1 = (or_word >> lsb) & mask
+            seen_0 = ~(and_word >> lsb) & mask
+
+            if reg.is_signed:
+                sign_vals = [val - (1 << width) if val >> (width - 1) else val for val in vals]
+            else:
+                sign_vals = vals
+
+            cov_list.append({
+                'name': reg.name.lower(),
+                'addr': addr,
+                'msb': reg.msb,
+                'lsb': reg.lsb,
+                'distinct': len(vals),
+                'toggle': bin(seen_1 & seen_0).count('1'),
+                'width': width,
+                'min': min(sign_vals),
+                'max': max(sign_vals),
+                'init_only': vals == {reg.init_val & mask},
+            })
+
+    return cov_list
+#}}}
+
+def cov_summary(cov_list: list, pat_num: int):
+    """Print the coverage summary"""  #{{{
+    name_len = max([len(cov['name']) for cov in cov_list], default=4)
+
+    print(f"{'name':<{name_len}}  {'addr':>6}  {'bits':>5}  {'distinct':>8}  "
+          f"{'toggle':>7}  {'min':>11}  {'max':>11}")
+    print('-' * (name_len + 66))
+    for cov in cov_list:
+        print(f"{cov['name']:<{name_len}}  {cov['addr']:#06x}  "
+              f"{cov['msb']:>2}:{cov['lsb']:<2}  {cov['distinct']:>8}  "
+              f"{cov['toggle']:>3}/{cov['width']:<3}  {cov['min']:>11}  {cov['max']:>11}"
+              + ('  (init)' if cov['init_only'] else ''))
+
+    bit_num = sum([cov['width'] for cov in cov_list])
+    toggle_num = sum([cov['toggle'] for cov in cov_list])
+    init_num = sum([cov['init_only'] for cov in cov_list])
+    print()
+    print(f"=== Number of pattern:            {pat_num}")
+    print(f"=== Number of field:              {len(cov_list)}")
+    print(f"=== Number of field never changed: {init_num}")
+    print(f"=== Bit toggle coverage:          {toggle_num}/{bit_num}"
+          + (f" ({toggle_num / bit_num:.1%})" if bit_num else ''))
+    print()
+#}}}
+
+def export_report(cov_list: list, pat_num: int, report_fp: str):
+    """Export the coverage report (json)"""  #{{{
+    report = {
+        'pattern': pat_num,
+        'field': cov_list,
+        'never_changed': [cov['name'] for cov in cov_list if cov['init_only']],
+    }
+    with open(report_fp, 'w') as f:
+        json.dump(report, f, indent=2)
+#}}}
+
+### Main ###
+
+def main():
+    """Main function"""  #{{{
+    parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawTextHelpFormatter,
+            description=textwrap.dedent("""
+                Register value coverage of a pattern corpus.
+
+                Report distinct values, bit toggles (each bit seen as 0 and 1), min/max and
+                fields never changed from the initial value.
+
+                Examples:
+
+                    @: %(prog)s -t table.txt hex pat.list -b -o cov.json
+
+                        Report the coverage of all hex patterns in 'pat.list'.
+
+                    @: %(prog)s -t table.txt ini regress.zip
+
+                        Report the coverage of all ini patterns in the archive.
+                """))
+
+    parser.add_argument('in_fmt', metavar='format', choices=['ini', 'hex', 'xlsx'],
+                                    help="corpus format (choices: ini/hex/xlsx)")
+    parser.add_argument('pat_fp', metavar='pattern',
+                                    help="pattern (list in batch mode, or zip archive)")
+
+    parser.add_argument('--version', action='version', version=PROG_VERSION)
+
+    table_gparser = parser.add_mutually_exclusive_group(required=True)
+    table_gparser.add_argument('-t', dest='txt_table_fp', metavar='<path>',
+                                        help="use text-style reference table")
+    table_gparser.add_argument('-x', dest='xlsx_table_fp', metavar='<path>',
+                                        help="use excel-style reference table")
+
+    parser.add_argument('-b', dest='is_batch', action='store_true',
+                                help="enable batch mode")
+    parser.add_argument('-j', dest='jobs', metavar='<num>', type=int, default=None,
+                                help="number of parallel jobs (default: cpu count)")
+    parser.add_argument('-o', dest='report_fp', metavar='<path>',
+                                help="export the coverage report (json)")
+
+    args = parser.parse_args()
+
+    if args.txt_table_fp:
+        table = PatternList(args.txt_table_fp, 'txt')
+    else:
+        table = PatternList(args.xlsx_table_fp, 'xlsx')
+
+    corpus = load_corpus(table, args.in_fmt, args.pat_fp, args.is_batch, args.jobs)
+    cov_list = field_coverage(table, corpus)
+
+    cov_summary(cov_list, len(corpus))
+    if args.report_fp:
+        export_report(cov_list, len(corpus), args.report_fp)
+
+    table.diag.summary()
+    return 0
+#}}}
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+"""
+Duplicate pattern detector
+"""
+import argparse
+import sys
+import textwrap
+from pathlib import Path
+
+from progparser import __version__
+from progparser.patverify import load_corpus, pat_names
+from progparser.progparser import PatternList
+from progparser.utils.dedup import Deduper, image_key
+
+PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
+
+### Function ###
+
+def dedup_corpus(corpus: dict) -> Deduper:
+    """Group patterns of the corpus by the packed word image"""  #{{{
+    deduper = Deduper()
+    for pat_name, (words, typed_vals) in corpus.items():
+        deduper.add(pat_name, image_key(words, typed_vals))
+    return deduper
+#}}}
+
+### Main ###
+
+def main():
+    """Main function"""  #{{{
+    parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawTextHelpFormatter,
+            description=textwrap.dedent("""
+                Duplicate pattern detector.
+
+                Patterns are packed to register words by the reference table, patterns with
+                the same register programming are grouped and the first one is kept.
+
+                Examples:
+
+                    @: %(prog)s -t table.txt ini ini.list -b -o uniq.list -a alias.json
+
+                        Write unique patterns of 'ini.list' to 'uniq.list' and the alias map.
+                """))
+
+    parser.add_argument('in_fmt', metavar='format', choices=['ini', 'hex', 'xlsx'],
+                                    help="corpus format (choices: ini/hex/xlsx)")
+    parser.add_argument('pat_fp', metavar='pattern',
+                                    help="pattern (list in batch mode, or zip archive)")
+
+    parser.add_argument('--version', action='version', version=PROG_VERSION)
+
+    table_gparser = parser.add_mutually_exclusive_group(required=True)
+    table_gparser.add_argument('-t', dest='txt_table_fp', metavar='<path>',
+                                        help="use text-style reference table")
+    table_gparser.add_argument('-x', dest='xlsx_table_fp', metavar='<path>',
+                                        help="use excel-style reference table")
+
+    parser.add_argument('-b', dest='is_batch', action='store_true',
+                                help="enable batch mode")
+    parser.add_argument('-j', dest='jobs', metavar='<num>', type=int, default=None,
+                                help="number of parallel jobs (default: cpu count)")
+    parser.add_argument('-o', dest='uniq_fp', metavar='<path>',
+                                help="write the unique pattern list")
+    parser.add_argument('-a', dest='alias_fp', metavar='<path>',
+                                help="export the alias map (json)")
+
+    args = parser.parse_args()
+
+    if args.txt_table_fp:
+        table = PatternList(args.txt_table_fp, 'txt')
+    else:
+        table = PatternList(args.xlsx_table_fp, 'xlsx')
+
+    corpus = load_corpus(table, args.in_fmt, args.pat_fp, args.is_batch, args.jobs)
+    deduper = dedup_corpus(corpus)
+
+    for kept_name, dup_names in deduper.groups().items():
+        print(f"[{kept_name}]")
+        for dup_name in dup_names:
+            print(f"  = {dup_name}")
+
+    print()
+    print(f"=== Number of pattern:            {len(corpus)}")
+    print(f"=== Number of pattern unique:     {len(corpus) - len(deduper.alias)}")
+    print(f"=== Number of pattern duplicated: {len(deduper.alias)}")
+    print()
+
+    if args.uniq_fp:
+        if args.is_batch and args.in_fmt != 'xlsx' and Path(args.pat_fp).suffix != '.zip':
+            cfg_fps = table.batch_list(args.pat_fp)
+            pat_fps = dict(zip(pat_names(cfg_fps), cfg_fps))
+        else:
+            pat_fps = {}
+        with open(args.uniq_fp, 'w') as f:
+            for pat_name in corpus:
+                if pat_name not in deduper.alias:
+                    f.write(f"{pat_fps.get(pat_name, pat_name)}\n")
+
+    if args.alias_fp:
+        deduper.export_alias(args.alias_fp)
+
+    table.diag.summary()
+    return 0
+#}}}
+
+if __name__ == '__main__':
+    sys.exit(main())
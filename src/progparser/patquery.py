@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+"""
+Pattern corpus index and query
+"""
+import argparse
+import os
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+from progparser import __version__
+from progparser.patverify import load_corpus, load_files
+from progparser.progparser import PatternList
+from progparser.utils.pat_index import PatIndex
+
+PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
+
+### Function ###
+
+def update_index(index: PatIndex, table: PatternList, fmt: str, pat_fp: str,
+                 is_batch: bool, jobs: int=None) -> int:
+    """Index new/changed patterns of the corpus, return the number indexed
+
+    In batch mode of ini/hex files, patterns are named by the file path
+    as listed, only files changed since the last update are read and
+    patterns removed from the list are dropped. Other corpora are
+    re-indexed as a whole.
+    """  #{{{
+    if not is_batch or fmt == 'xlsx' or Path(pat_fp).suffix == '.zip':
+        corpus = load_corpus(table, fmt, pat_fp, is_batch, jobs)
+        index.update([(pat_name, words) for pat_name, (words, _) in corpus.items()])
+        return len(corpus)
+
+    stamps = {}
+    for cfg_fp in table.batch_list(pat_fp):
+        st = os.stat(cfg_fp)
+        stamps[cfg_fp] = (st.st_size, st.st_mtime_ns)
+
+    index.remove([cfg_fp for cfg_fp in index.stamps if cfg_fp not in stamps])
+    dirty_fps = [cfg_fp for cfg_fp, stamp in stamps.items()
+                 if index.stamps.get(cfg_fp) != stamp or cfg_fp not in index.pat_ids]
+
+    index.update(load_files(table, fmt, dirty_fps, jobs, names=dirty_fps))
+    index.stamps = stamps
+    return len(dirty_fps)
+#}}}
+
+### Main ###
+
+def main():
+    """Main function"""  #{{{
+    parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawTextHelpFormatter,
+            description=textwrap.dedent("""
+                Pattern corpus index and query.
+
+                Build a persistent index of field values over a pattern corpus, and find
+                patterns by a boolean query of field values.
+
+                Examples:
+
+                    @: %(prog)s -i corpus.idx -t table.txt -u ini ini.list -b
+
+                        Create or update the index by ini patterns in 'ini.list'.
+
+                    @: %(prog)s -i corpus.idx -q "group1_var2_1 == 3 && group1_var2_2 != 0"
+
+                        List patterns matched the query.
+
+                Query syntax:
+
+                    <field> <op> <number>    op: == != < <= > >=
+                    <query> && <query>, <query> || <query>, !<query>, (<query>)
+                """))
+
+    parser.add_argument('--version', action='version', version=PROG_VERSION)
+
+    parser.add_argument('-i', dest='index_fp', metavar='<path>', required=True,
+                                help="index file path")
+
+    table_gparser = parser.add_mutually_exclusive_group()
+    table_gparser.add_argument('-t', dest='txt_table_fp', metavar='<path>',
+                                        help="use text-style reference table")
+    table_gparser.add_argument('-x', dest='xlsx_table_fp', metavar='<path>',
+                                        help="use excel-style reference table")
+
+    parser.add_argument('-u', dest='update', metavar=('<format>', '<pattern>'), nargs=2,
+                                help="index the corpus (format: ini/hex/xlsx)")
+    parser.add_argument('-b', dest='is_batch', action='store_true',
+                                help="enable batch mode")
+    parser.add_argument('-j', dest='jobs', metavar='<num>', type=int, default=None,
+                                help="number of parallel jobs (default: cpu count)")
+    parser.add_argument('-q', dest='query', metavar='<query>',
+                                help="query patterns")
+
+    args = parser.parse_args()
+
+    index = PatIndex.load(args.index_fp) if Path(args.index_fp).exists() else None
+
+    ## Update index
+
+    if args.update:
+        fmt, pat_fp = args.update
+        if fmt not in ('ini', 'hex', 'xlsx'):
+            parser.error(f"invalid corpus format ({fmt})")
+
+        if args.txt_table_fp:
+            table = PatternList(args.txt_table_fp, 'txt')
+        elif args.xlsx_table_fp:
+            table = PatternList(args.xlsx_table_fp, 'xlsx')
+        else:
+            parser.error("a reference table (-t/-x) is required to update the index")
+
+        layout = PatIndex.table_layout(table)
+        if index is None or index.layout != layout:
+            if index is not None:
+                print("[INFO] table layout changed, rebuild the index.")
+            index = PatIndex(layout)
+
+        pat_cnt = update_index(index, table, fmt, pat_fp, args.is_batch, args.jobs)
+        index.save(args.index_fp)
+        print(f"[INFO] {pat_cnt} patterns indexed ({len(index)} in total).")
+        table.diag.summary()
+
+    ## Query
+
+    if args.query:
+        if index is None:
+            print(f"[Error] index '{args.index_fp}' is not found.")
+            return 1
+
+        start = time.perf_counter()
+        try:
+            pat_names = index.match(args.query)
+        except (SyntaxError, ValueError) as e:
+            print(f"[Error] {e}")
+            return 1
+        elapsed = time.perf_counter() - start
+
+        for pat_name in pat_names:
+            print(pat_name)
+        print()
+        print(f"=== Number of pattern matched: {len(pat_names)}/{len(index)} "
+              f"({elapsed * 1000:.1f} ms)")
+        print()
+
+    return 0
+#}}}
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+"""
+Pattern corpus equivalence checker
+"""
+import argparse
+import os
+import sys
+import textwrap
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from progparser import __version__
+from progparser.progparser import PatternList
+from progparser.utils.reg_array import RegArray
+from progparser.utils.shared_table import SharedTable
+
+PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
+
+CHUNK_SIZE = 256
+
+### Function ###
+
+worker_table = None
+
+def init_worker(table, is_detail: bool=False):
+    """Set the reference table of the worker process
+
+    'table' is a RegArray or the handle of a SharedTable.
+    """  #{{{
+    global worker_table
+    if isinstance(table, tuple):
+        worker_table = PatternList(table, 'shared')
+    else:
+        worker_table = PatternList(table, 'array')
+    worker_table.diag.is_detail = is_detail
+#}}}
+
+def pack_files(fmt: str, cfg_fps: list, names: list) -> tuple:
+    """Read and pack patterns in the worker process
+
+    Return (packs, diag), warnings of the chunk are merged by the parent.
+    """  #{{{
+    worker_table.diag.clear()
+    return read_files(worker_table, fmt, cfg_fps, names), worker_table.diag
+#}}}
+
+def read_files(table: PatternList, fmt: str, cfg_fps: list, names: list) -> list:
+    """Read and pack ini/hex pattern files as patterns of the given names"""  #{{{
+    return pack_pats(table, fmt,
+                     [(table.ini_read(cfg_fp) if fmt == 'ini'
+                       else table.hex_read(cfg_fp))._replace(name=pat_name)
+                      for cfg_fp, pat_name in zip(cfg_fps, names)])
+#}}}
+
+def pack_pats(table: PatternList, fmt: str, pats: list) -> list:
+    """Pack patterns to [(pat_name, words, typed_vals), ...]"""  #{{{
+    addr_map = list(table.addr_map(rsv_max=0))
+    typed_regs = [reg for ini_grp in table.ini_table for reg in ini_grp.regs
+                  if reg.type in ('str', 'float', 'int')] if fmt == 'ini' else []
+
+    packs = []
+    for pat in pats:
+        typed_vals = {reg.name: table.typed_value(reg, pat.regs.get(reg.name, reg.init_val), pat.name)
+                      for reg in typed_regs}
+        packs.append((pat.name, table.hex_words(pat, addr_map).tobytes(), typed_vals))
+
+    return packs
+#}}}
+
+def pat_names(cfg_fps: list) -> list:
+    """Name patterns by the path relative to the common directory
+
+    The suffix is dropped, patterns of a flat directory keep the file stem
+    and patterns of the batchgen layout (<bat_dir>/<pat>/age_reg.ini) are
+    named '<pat>/age_reg'.
+    """  #{{{
+    abs_fps = [os.path.abspath(cfg_fp) for cfg_fp in cfg_fps]
+    if not abs_fps:
+        return []
+    root = os.path.commonpath([os.path.dirname(abs_fp) for abs_fp in abs_fps])
+    return [Path(os.path.relpath(abs_fp, root)).with_suffix('').as_posix()
+            for abs_fp in abs_fps]
+#}}}
+
+def load_archive(table: PatternList, fmt: str, zip_fp: str) -> list:
+    """Load ini/hex patterns from a zip archive"""  #{{{
+    pats = []
+    with zipfile.ZipFile(zip_fp) as zf:
+        infos = [info for info in zf.infolist() if not info.is_dir() 
+                 and (Path(info.filename).suffix == '.ini') == (fmt == 'ini')]
+        names = pat_names([info.filename for info in infos])
+        for info, pat_name in zip(infos, names):
+            lines = zf.read(info).decode().splitlines(keepends=True)
+            if fmt == 'ini':
+                pats.append(table.ini_load(lines, pat_name))
+            else:
+                pats.append(table.hex_load(lines, pat_name))
+    return pats
+#}}}
+
+def load_files(table: PatternList, fmt: str, cfg_fps: list, jobs: int=None,
+               names: list=None) -> list:
+    """Read and pack ini/hex pattern files by chunks (in parallel)
+
+    Patterns are named by pat_names() of the files if 'names' is not given.
+    """  #{{{
+    if names is None:
+        names = pat_names(cfg_fps)
+    chunks = [cfg_fps[i:i+CHUNK_SIZE] for i in range(0, len(cfg_fps), CHUNK_SIZE)]
+    name_chunks = [names[i:i+CHUNK_SIZE] for i in range(0, len(names), CHUNK_SIZE)]
+    packs = []
+    if jobs == 1 or len(chunks) < 2:
+        for chunk, name_chunk in zip(chunks, name_chunks):
+            packs.extend(read_files(table, fmt, chunk, name_chunk))
+    else:
+        try:
+            shared = SharedTable(table)
+            worker_arg = shared.handle
+        except OSError:
+            shared = None
+            worker_arg = RegArray.from_table(table)
+
+        try:
+            with ProcessPoolExecutor(jobs, initializer=init_worker,
+                                     initargs=(worker_arg, table.diag.is_detail)) as executor:
+                for chunk_packs, diag in executor.map(pack_files, [fmt]*len(chunks),
+                                                      chunks, name_chunks):
+                    packs.extend(chunk_packs)
+                    table.diag.merge(diag)
+        finally:
+            if shared is not None:
+                shared.close()
+    return packs
+#}}}
+
+def load_corpus(table: PatternList, fmt: str, pat_fp: str, is_batch: bool,
+                jobs: int=None) -> dict:
+    """Load and pack a pattern corpus to {pat_name: (words, typed_vals)}"""  #{{{
+    if fmt == 'xlsx':
+        packs = pack_pats(table, fmt, table.xlsx_load(pat_fp, is_batch=True))
+    elif Path(pat_fp).suffix == '.zip':
+        packs = pack_pats(table, fmt, load_archive(table, fmt, pat_fp))
+    else:
+        cfg_fps = table.batch_list(pat_fp) if is_batch else [pat_fp]
+        packs = load_files(table, fmt, cfg_fps, jobs)
+
+    corpus = {}
+    for pat_name, words, typed_vals in packs:
+        if pat_name in corpus:
+            print(f"[Warning] duplicated pattern '{pat_name}', use the last one.")
+        corpus[pat_name] = (words, typed_vals)
+    return corpus
+#}}}
+
+def diff_fields(table: PatternList, addrs: array, l_words: bytes, 
+                r_words: bytes) -> list:
+    """Get different fields [(reg, l_val, r_val), ...] of two hex images"""  #{{{
+    l_words = array('I', l_words)
+    r_words = array('I', r_words)
+
+    diff_list = []
+    for addr, l_word, r_word in zip(addrs, l_words, r_words):
+        if (xor := l_word ^ r_word) == 0:
+            continue
+        for reg, lsb, mask, word_mask in table.field_index[addr]:
+            if xor & word_mask:
+                diff_list.append((reg,
+                                  (l_word >> lsb) & mask,
+                                  (r_word >> lsb) & mask))
+    return diff_list
+#}}}
+
+def verify_corpus(table: PatternList, l_corpus: dict, r_corpus: dict) -> bool:
+    """Compare two corpora and report different fields"""  #{{{
+    l_only = [name for name in l_corpus if name not in r_corpus]
+    r_only = [name for name in r_corpus if name not in l_corpus]
+    addrs = table.hex_addrs(list(table.addr_map(rsv_max=0)))
+    diff_cnt = 0
+
+    for pat_name, (l_words, l_typed) in l_corpus.items():
+        if pat_name not in r_corpus:
+            continue
+        r_words, r_typed = r_corpus[pat_name]
+        if l_words == r_words and (not l_typed or not r_typed or l_typed == r_typed):
+            continue
+
+        diff_cnt += 1
+        print(f"[{pat_name}]")
+        for reg, l_val, r_val in diff_fields(table, addrs, l_words, r_words):
+            print(f"  {reg.name.lower()}: {l_val:#x} != {r_val:#x}")
+        if l_typed and r_typed:
+            for reg_name, l_val in l_typed.items():
+                if l_val != (r_val := r_typed[reg_name]):
+                    print(f"  {reg_name.lower()}: {l_val} != {r_val}")
+
+    for pat_name in l_only:
+        print(f"< {pat_name}")
+    for pat_name in r_only:
+        print(f"> {pat_name}")
+
+    print()
+    print(f"=== Number of pattern compared:  {len(l_corpus) - len(l_only)}")
+    print(f"=== Number of pattern different: {diff_cnt}")
+    print(f"=== Number of pattern unpaired:  {len(l_only) + len(r_only)}")
+    print()
+
+    return diff_cnt == 0 and not l_only and not r_only
+#}}}
+
+### Main ###
+
+def main():
+    """Main function"""  #{{{
+    parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawTextHelpFormatter,
+            description=textwrap.dedent("""
+                Pattern corpus equivalence checker.
+
+                Patterns of both corpora are packed to register words by the reference table
+                and paired by the pattern name, only different fields are reported.
+
+                Examples:
+
+                    @: %(prog)s -t table.txt ini hex ini.list pat.list -b
+
+                        Check all ini patterns in 'ini.list' against hex patterns in 'pat.list'.
+
+                    @: %(prog)s -x table.xlsx xlsx ini register.xlsx ini.list -b
+
+                        Check all pattern columns in the excel table against ini patterns.
+
+                A '.zip' archive of ini/hex patterns can be given as a corpus.
+                """))
+
+    parser.add_argument('l_fmt', metavar='left_format', choices=['ini', 'hex', 'xlsx'],
+                                    help="left corpus format (choices: ini/hex/xlsx)")
+    parser.add_argument('r_fmt', metavar='right_format', choices=['ini', 'hex', 'xlsx'],
+                                    help="right corpus format (choices: ini/hex/xlsx)")
+    parser.add_argument('l_pat_fp', metavar='left_pattern',
+                                    help="left pattern (or list in batch mode)")
+    parser.add_argument('r_pat_fp', metavar='right_pattern',
+                                    help="right pattern (or list in batch mode)")
+
+    parser.add_argument('--version', action='version', version=PROG_VERSION)
+
+    table_gparser = parser.add_mutually_exclusive_group(required=True)
+    table_gparser.add_argument('-t', dest='txt_table_fp', metavar='<path>',
+                                        help="use text-style reference table")
+    table_gparser.add_argument('-x', dest='xlsx_table_fp', metavar='<path>',
+                                        help="use excel-style reference table")
+
+    parser.add_argument('-b', dest='is_batch', action='store_true',
+                                help="enable batch mode")
+    parser.add_argument('-j', dest='jobs', metavar='<num>', type=int, default=None,
+                                help="number of parallel jobs (default: cpu count)")
+
+    args = parser.parse_args()
+
+    if args.txt_table_fp:
+        table = PatternList(args.txt_table_fp, 'txt')
+    else:
+        table = PatternList(args.xlsx_table_fp, 'xlsx')
+
+    l_corpus = load_corpus(table, args.l_fmt, args.l_pat_fp, args.is_batch, args.jobs)
+    r_corpus = load_corpus(table, args.r_fmt, args.r_pat_fp, args.is_batch, args.jobs)
+
+    is_equal = verify_corpus(table, l_corpus, r_corpus)
+    table.diag.summary()
+    return 0 if is_equal else 1
+#}}}
+
+if __name__ == '__main__':
+    sys.exit(main())
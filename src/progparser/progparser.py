@@ -14,14 +14,30 @@ import pickle
 import shutil
 import sys
 import textwrap
+import time
+from array import array
 from pathlib import Path
 from typing import NamedTuple
 
 import openpyxl
 
 from progparser import __version__
-from progparser.utils.general import str2int
+from progparser.utils.burst import burst_runs
+from progparser.utils.checksum import (CHECKSUMS, SIDECAR, checksum, drop_sidecar, 
+                                       parse_trailer, save_sidecar, sidecar_sum, 
+                                       trailer)
+from progparser.utils.dedup import Deduper, image_key
+from progparser.utils.delta import greedy_order
+from progparser.utils.diag import Diagnostics
+from progparser.utils.general import str2int, str2int_column
+from progparser.utils.ini_cache import parse_ini
+from progparser.utils.matrix import CHUNK_SIZE, export_matrix, import_matrix
+from progparser.utils.reg_array import RegArray
 from progparser.utils.ref_table import ReferenceTable
+from progparser.utils.shared_table import attach_table
+from progparser.utils.sink import AsyncDirSink, DirSink
+from progparser.utils.sqlite_db import RegDB
+from progparser.utils.watch import FileWatcher
 
 PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
@@ -39,9 +55,17 @@ class PatternList(ReferenceTable):
 
     def __init__(self, table_fp: str, table_type: str, debug_mode: set=None):
         # pat_list = [pat1, pat2, ...]
+        # table_type 'array' takes a RegArray object as table_fp
+        # table_type 'db' of a RegArray keeps RegView registers on the columns
+        # table_type 'shared' takes the handle of a SharedTable as table_fp,
+        # registers are RegView objects on the attached columns
 
         super().__init__(debug_mode)
+        # io_jobs = number of writer threads of dumps (0: synchronous)
         self.pat_list  = []
+        self.diag = Diagnostics()
+        self.io_jobs = 0
+        self.is_fsync = False
 
         if table_type == 'txt':
             self.txt_table_parser(table_fp)
@@ -49,117 +73,131 @@ class PatternList(ReferenceTable):
             self.xlsx_table_parser(table_fp)
         elif table_type == 'db':
             with open(table_fp, 'rb') as f:
-                self.reg_table = pickle.load(f)
-                self.ini_table = pickle.load(f)
+                obj = pickle.load(f)
+                if isinstance(obj, RegArray):
+                    obj.to_table(self, is_lazy=True)
+                else:
+                    self.reg_table = obj
+                    self.ini_table = pickle.load(f)
+                    self.build_index()
+        elif table_type == 'array':
+            table_fp.to_table(self)
+        elif table_type == 'shared':
+            attach_table(table_fp).to_table(self, is_lazy=True)
+        elif table_type == 'sqlite':
+            with RegDB(table_fp, is_readonly=True) as db:
+                db.load_table(self)
         else:
             raise ValueError(f"unsupported register table type ({table_type})")
 
-    def ini_parser(self, ini_fp: str, is_batch=False, start=0, end=0):
-        """Pattern parser for INI format"""
-        cfg_fps = []
-        if is_batch:
-            with open(ini_fp, 'r') as f:
-                tmp_fps = f.readlines()
+    def batch_list(self, list_fp: str, start=0, end=0) -> list:
+        """Read pattern paths from the batch list"""
+        with open(list_fp, 'r') as f:
+            tmp_fps = f.readlines()
 
-            if start < 1:
-                start = 1
-            elif start > len(tmp_fps):
-                start = len(tmp_fps)
+        if start < 1:
+            start = 1
+        elif start > len(tmp_fps):
+            start = len(tmp_fps)
 
-            if end == 0 or end > len(tmp_fps):
-                end = len(tmp_fps)
-            elif end < start:
-                end = start
+        if end == 0 or end > len(tmp_fps):
+            end = len(tmp_fps)
+        elif end < start:
+            end = start
 
-            for i in range(start-1, end):
-                cfg_fps.append(tmp_fps[i].strip())
+        return [tmp_fps[i].strip() for i in range(start-1, end)]
+
+    def ini_parser(self, ini_fp: str, is_batch=False, start=0, end=0):
+        """Pattern parser for INI format"""
+        if is_batch:
+            cfg_fps = self.batch_list(ini_fp, start, end)
         else:
-            cfg_fps.append(ini_fp)
+            cfg_fps = [ini_fp]
 
         for cfg_fp in cfg_fps:
-            pat_regs = {}
-            with open(cfg_fp, 'r') as f:
-                line = f.readline()
-                line_no = 1
-                while line:
-                    if line.startswith('['):
-                        pass
-                    elif line.startswith('#'):
-                        pass
-                    else:
-                        toks = line.split()
-                        try:
-                            if len(toks) and toks[1] == '=':
-                                str_ = ' '.join(toks[2:])
-                                pat_regs[toks[0].upper()] = str_.split('#')[0].strip("\"\' ")
-                        except Exception as e:
-                            print('-' * 60)
-                            print("INIRegParseError: (line: {})".format(line_no))
-                            print("syntax of register descriptor:")
-                            print("  '<reg_name> = <value> [comment]'")
-                            print('-' * 60)
-                            raise e
-                    line = f.readline()
-                    line_no += 1
-
-            if 'p' in self.debug_mode:
-                print(f"=== INI READ ({cfg_fp}) ===")
-                for item in pat_regs.items():
-                    print(item)
-                print()
+            self.pat_list.append(self.ini_read(cfg_fp))
+
+    def ini_read(self, cfg_fp: str) -> Pat:
+        """Read one INI pattern"""
+        pat_name = os.path.basename(cfg_fp)
+        pat_name = os.path.splitext(pat_name)[0]
+        with open(cfg_fp, 'r') as f:
+            return self.ini_load(f, pat_name)
+
+    def ini_load(self, lines, pat_name: str) -> Pat:
+        """Load one INI pattern from lines (file object or list)"""
+        return self.ini_pat(pat_name, parse_ini(lines))
+
+    def ini_pat(self, pat_name: str, pat_regs: dict) -> Pat:
+        """Create one INI pattern"""
+        if 'p' in self.debug_mode:
+            print(f"=== INI READ ({pat_name}) ===")
+            for item in pat_regs.items():
+                print(item)
+            print()
 
-            pat_name = os.path.basename(cfg_fp)
-            pat_name = os.path.splitext(pat_name)[0]
-            self.pat_list.append(Pat(pat_name, pat_regs))
+        return Pat(pat_name, pat_regs)
 
     def hex_parser(self, hex_fp: str, is_batch=False, start=0, end=0):
         """Pattern parser for HEX format"""
-        cfg_fps = []
         if is_batch:
-            with open(hex_fp, 'r') as f:
-                tmp_fps = f.readlines()
-
-            if start < 1:
-                start = 1
-            elif start > len(tmp_fps):
-                start = len(tmp_fps)
-
-            if end == 0 or end > len(tmp_fps):
-                end = len(tmp_fps)
-            elif end < start:
-                end = start
-
-            for i in range(start-1, end):
-                cfg_fps.append(tmp_fps[i].rstrip())
+            cfg_fps = self.batch_list(hex_fp, start, end)
         else:
-            cfg_fps.append(hex_fp)
+            cfg_fps = [hex_fp]
 
         for cfg_fp in cfg_fps:
-            pat_regs = {}
-            with open(cfg_fp, 'r') as f:
-                line = f.readline()
-                while line:
-                    addr = int(line[0:4], 16)
-                    val = int(line[4:12], 16)
-                    if addr in self.reg_table:
-                        table_regs = self.reg_table[addr].regs
-                        for reg in table_regs:
-                            mask = (1 << (reg.msb - reg.lsb + 1)) - 1
-                            pat_regs[reg.name] = hex((val >> reg.lsb) & mask)
-                    line = f.readline()
-
-            if 'p' in self.debug_mode:
-                print(f"=== HEX READ ({cfg_fp}) ===")
-                for item in pat_regs.items():
-                    print(item)
-                print()
+            self.pat_list.append(self.hex_read(cfg_fp))
+
+    def hex_read(self, cfg_fp: str) -> Pat:
+        """Read one HEX pattern"""
+        pat_name = os.path.basename(cfg_fp)
+        pat_name = os.path.splitext(pat_name)[0]
+        with open(cfg_fp, 'r') as f:
+            return self.hex_load(f, pat_name, sidecar_sum(cfg_fp))
+
+    def hex_load(self, lines, pat_name: str, check_sum: tuple=None) -> Pat:
+        """Load one HEX pattern from lines (file object or list)
+
+        Comment lines are skipped. The checksum of the trailer record or 
+        'check_sum' (algo, value) is verified if present.
+        """
+        pat_regs = {}
+        words = array('I')
+        for line in lines:
+            if line.startswith('//'):
+                check_sum = parse_trailer(line) or check_sum
+                continue
+            addr = int(line[0:4], 16)
+            val = int(line[4:12], 16)
+            words.append(val)
+            for fld in self.field_index.get(addr, ()):
+                pat_regs[fld.reg.name] = hex((val >> fld.lsb) & fld.mask)
+
+        if check_sum is not None:
+            algo, exp_val = check_sum
+            if (act_val := checksum(words, algo)) != exp_val:
+                print('-' * 60)
+                print("ChecksumError:")
+                print("pattern:  {}".format(pat_name))
+                print("{}:    0x{:08x} (expect: 0x{:08x})".format(algo, act_val, exp_val))
+                print('-' * 60)
+                raise ValueError("ChecksumError")
+
+        if 'p' in self.debug_mode:
+            print(f"=== HEX READ ({pat_name}) ===")
+            for item in pat_regs.items():
+                print(item)
+            print()
 
-            pat_name = os.path.basename(cfg_fp)
-            pat_name = os.path.splitext(pat_name)[0]
-            self.pat_list.append(Pat(pat_name, pat_regs))
+        return Pat(pat_name, pat_regs)
 
     def xlsx_parser(self, xlsx_fp: str, is_batch=False, start=0, end=0):
         """Pattern parser for INI format"""
+        self.pat_list.extend(self.xlsx_load(xlsx_fp, is_batch, start, end))
+
+    def xlsx_load(self, xlsx_fp, is_batch=False, start=0, end=0) -> list:
+        """Load patterns from the excel table (path or file object)"""
+        pats = []
         wb = openpyxl.load_workbook(xlsx_fp, data_only=True)
         ws = wb.worksheets[0]
 
@@ -216,9 +254,77 @@ class PatternList(ReferenceTable):
                     print(item)
                 print()
 
-            self.pat_list.append(Pat(pat_name, pat_regs))
+            pats.append(Pat(pat_name, pat_regs))
 
         wb.close()
+        return pats
+
+    def check_pattern(self) -> int:
+        """Validate all patterns against the table before dump
+
+        Values are validated per register over unique literals, so a sweep 
+        repeating the same values is checked once per value, as a column 
+        while no error is found. Unknown 
+        register names are recorded as warnings. All errors are printed, 
+        return the number of failed patterns.
+        """
+        # val_table = {reg_name: {value: [pat_name, ...]}, ...}
+        val_table = {}
+        for pat in self.pat_list:
+            for reg_name, value in pat.regs.items():
+                if reg_name in self.reg_index:
+                    val_table.setdefault(reg_name, {}).setdefault(value, []).append(pat.name)
+                else:
+                    self.diag.warn('unknown', reg_name, pat.name)
+
+        err_pats = set()
+        for reg_name, reg_vals in val_table.items():
+            reg = self.reg_index[reg_name]
+            if not reg.is_access or reg.type == 'str':
+                continue
+            if reg.type == 'reg':
+                try:
+                    str2int_column(list(reg_vals), reg.is_signed, reg.msb - reg.lsb + 1)
+                    continue
+                except ValueError:
+                    pass
+            for value, pat_names in reg_vals.items():
+                if (kind := self.check_value(reg, value)) is None:
+                    continue
+                err_pats.update(pat_names)
+                print("[Error] {}: {} = {} ({} patterns: {}{})".format(
+                      kind, reg_name.lower(), value, len(pat_names),
+                      ', '.join(pat_names[:5]), ', ...' if len(pat_names) > 5 else ''))
+
+        if len(err_pats):
+            print(f"\n=== Number of pattern failed: {len(err_pats)}\n")
+
+        return len(err_pats)
+
+    def check_value(self, reg, value: str) -> str:
+        """Check one register value, return the error kind or None"""
+        try:
+            if reg.type == 'float':
+                float(value)
+            elif reg.type == 'int':
+                int(value)
+            else:
+                str2int(value, reg.is_signed, reg.msb - reg.lsb + 1)
+        except ValueError as e:
+            if str(e) == 'number overflow':
+                return 'overflow'
+            elif str(e).startswith('negative value'):
+                return 'sign'
+            return 'value'
+        except Exception:
+            return 'value'
+        return None
+
+    def open_sink(self, pat_dir) -> DirSink:
+        """Open the output sink of dumps (threaded if 'io_jobs' is set)"""
+        if self.io_jobs:
+            return AsyncDirSink(pat_dir, self.io_jobs, is_fsync=self.is_fsync)
+        return DirSink(pat_dir, self.is_fsync)
 
     def ini_dump(self, pat_dir, pat_name=None, pat_ext=None, is_force=False, 
                  info_dump=True):
@@ -230,91 +336,24 @@ class PatternList(ReferenceTable):
         pat_ignore = 0
         is_batch = len(self.pat_list) > 1
 
-        for pat in self.pat_list:
-            if pat_name:
-                pname = pat_name + str(pat_cnt) if is_batch else pat_name
-            else:
-                pname = pat.name
+        with self.open_sink(pat_dir) as sink:
+            for pat in self.pat_list:
+                if pat_name:
+                    pname = pat_name + str(pat_cnt) if is_batch else pat_name
+                else:
+                    pname = pat.name
 
-            pat_path = pat_dir / (pname + pat_ext)
+                pat_path = pat_dir / (pname + pat_ext)
 
-            if pat_path.exists() and not is_force:
-                if input(f"{pname+pat_ext} existed, overwrite? (y/n) ").lower() != 'y':
-                    print('Ignore')
-                    pat_cnt += 1
-                    pat_ignore += 1
-                    continue
+                if pat_path.exists() and not is_force:
+                    if input(f"{pname+pat_ext} existed, overwrite? (y/n) ").lower() != 'y':
+                        print('Ignore')
+                        pat_cnt += 1
+                        pat_ignore += 1
+                        continue
 
-            with open(pat_path, 'w') as f:
-                is_first_tag = True
-                for ini_grp in self.ini_table:
-                    if ini_grp.tag is not None:
-                        if is_first_tag:
-                            is_first_tag = False
-                        else:
-                            f.write("\n")
-                        f.write(f"[{ini_grp.tag}]\n")
-
-                    for reg in ini_grp.regs:
-                        if reg.name == '<br>':
-                            f.write("\n")
-                            continue
-
-                        if reg.is_access:
-                            try:
-                                if reg.name in pat.regs:
-                                    if reg.type == 'str':
-                                        match reg.extra:
-                                            case 's':
-                                                reg_val = f"\'{pat.regs[reg.name]}\'"
-                                            case 'd':
-                                                reg_val = f"\"{pat.regs[reg.name]}\""
-                                            case _:
-                                                reg_val = pat.regs[reg.name]
-                                    elif reg.type == 'float':
-                                        reg_val = float(pat.regs[reg.name])
-                                    elif reg.type == 'int':
-                                        reg_val = int(pat.regs[reg.name])
-                                    else:
-                                        reg_bits = reg.msb - reg.lsb + 1
-                                        reg_val = str2int(pat.regs[reg.name], 
-                                                          reg.is_signed, 
-                                                          reg_bits)
-                                else:
-                                    print(f"[Warning] '{reg.name.lower()}' is not found in pattern '{pat.name}', use default value.")
-                                    if reg.type == 'str' and reg.extra == 's':
-                                        reg_val = f"\'{reg.init_val}\'" 
-                                    elif reg.type == 'str' and reg.extra == 'd':
-                                        reg_val = f"\"{reg.init_val}\"" 
-                                    else:
-                                        reg_val = reg.init_val
-                            except Exception as e:
-                                print('-' * 60)
-                                print("RegisterValueError:")
-                                print("pattern:  {}".format(pat.name))
-                                print("register: {}".format(reg.name))
-                                print('-' * 60)
-                                raise SyntaxError("RegisterValueError") 
-
-                            if reg.name in self.hex_out:
-                                mask = (1 << (reg.msb - reg.lsb + 1)) - 1
-                                if -65536 <= reg_val <= 65535:
-                                    reg_val &= 0xffff
-                                    lens = ini_grp.max_len + 12
-                                    f.write(f"{reg.name.lower()} = {reg_val:#06x}".ljust(lens))
-                                else:
-                                    reg_val &= 0xffffffff
-                                    lens = ini_grp.max_len + 16
-                                    f.write(f"{reg.name.lower()} = {reg_val:#010x}".ljust(lens))
-                            else:
-                                lens = ini_grp.max_len + 11
-                                f.write(f"{reg.name.lower()} = {reg_val}".ljust(lens))
-
-                            if reg.comment is not None:
-                                f.write(f" # {reg.comment}\n")
-                            else:
-                                f.write("\n")
-            pat_cnt += 1
+                sink.write(pname + pat_ext, self.ini_render(pat))
+                pat_cnt += 1
 
         if info_dump:
             print()
@@ -322,74 +361,470 @@ class PatternList(ReferenceTable):
             print(f"=== Number of pattern ignored:   {pat_ignore}")
             print()
 
+    def ini_render(self, pat: Pat) -> str:
+        """Render one pattern with ini format"""
+        lines = []
+        is_first_tag = True
+        for ini_grp in self.ini_table:
+            if ini_grp.tag is not None:
+                if is_first_tag:
+                    is_first_tag = False
+                else:
+                    lines.append("\n")
+                lines.append(f"[{ini_grp.tag}]\n")
+
+            for reg in ini_grp.regs:
+                if reg.name == '<br>':
+                    lines.append("\n")
+                    continue
+
+                if reg.is_access:
+                    try:
+                        if reg.name in pat.regs:
+                            if reg.type == 'str':
+                                match reg.extra:
+                                    case 's':
+                                        reg_val = f"\'{pat.regs[reg.name]}\'"
+                                    case 'd':
+                                        reg_val = f"\"{pat.regs[reg.name]}\""
+                                    case _:
+                                        reg_val = pat.regs[reg.name]
+                            elif reg.type == 'float':
+                                reg_val = float(pat.regs[reg.name])
+                            elif reg.type == 'int':
+                                reg_val = int(pat.regs[reg.name])
+                            else:
+                                reg_bits = reg.msb - reg.lsb + 1
+                                reg_val = str2int(pat.regs[reg.name], 
+                                                  reg.is_signed, 
+                                                  reg_bits)
+                        else:
+                            self.diag.warn('missing', reg.name, pat.name)
+                            if reg.type == 'str' and reg.extra == 's':
+                                reg_val = f"\'{reg.init_val}\'" 
+                            elif reg.type == 'str' and reg.extra == 'd':
+                                reg_val = f"\"{reg.init_val}\"" 
+                            else:
+                                reg_val = reg.init_val
+                    except Exception as e:
+                        print('-' * 60)
+                        print("RegisterValueError:")
+                        print("pattern:  {}".format(pat.name))
+                        print("register: {}".format(reg.name))
+                        print('-' * 60)
+                        raise SyntaxError("RegisterValueError") 
+
+                    if reg.name in self.hex_out:
+                        if -65536 <= reg_val <= 65535:
+                            reg_val &= 0xffff
+                            lens = ini_grp.max_len + 12
+                            lines.append(f"{reg.name.lower()} = {reg_val:#06x}".ljust(lens))
+                        else:
+                            reg_val &= 0xffffffff
+                            lens = ini_grp.max_len + 16
+                            lines.append(f"{reg.name.lower()} = {reg_val:#010x}".ljust(lens))
+                    else:
+                        lens = ini_grp.max_len + 11
+                        lines.append(f"{reg.name.lower()} = {reg_val}".ljust(lens))
+
+                    if reg.comment is not None:
+                        lines.append(f" # {reg.comment}\n")
+                    else:
+                        lines.append("\n")
+
+        return ''.join(lines)
+
+    def sqlite_parser(self, db_fp: str, sql: str=None):
+        """Pattern parser for SQLite database (patterns selected by sql)"""
+        with RegDB(db_fp, is_readonly=True) as db:
+            for pat_name, pat_regs in db.load_patterns(sql):
+                self.pat_list.append(self.ini_pat(pat_name, pat_regs))
+
+    def sqlite_dump(self, pat_dir, pat_name=None, info_dump=True):
+        """Dump the table and patterns into SQLite database
+
+        Patterns are appended to an existed database, patterns of the 
+        same name are replaced.
+        """
+        pname = pat_name if pat_name else 'register'
+        with RegDB(pat_dir / (pname + '.db')) as db:
+            db.save_table(self)
+            db.save_patterns(self.pat_list)
+
+        if info_dump:
+            print(f"\n=== Number of pattern generated: {len(self.pat_list)}\n")
+
+    def matrix_fields(self) -> list:
+        """Get address fields of the matrix in ini_table order"""
+        addrs = set(self.hex_addrs(list(self.addr_map(rsv_max=0))))
+        return [reg for ini_grp in self.ini_table for reg in ini_grp.regs
+                if reg.type == 'reg' and reg.name != 'RESERVED' and reg.addr in addrs]
+
+    def matrix_rows(self, pats: list, fields: list):
+        """Iterate field values of patterns by chunks of rows"""
+        addr_map = list(self.addr_map(rsv_max=0))
+        word_idx = {addr: i for i, addr in enumerate(self.hex_addrs(addr_map))}
+        specs = [(word_idx[reg.addr], reg.lsb, reg.msb - reg.lsb + 1, reg.is_signed)
+                 for reg in fields]
+
+        for st in range(0, len(pats), CHUNK_SIZE):
+            rows = []
+            for pat in pats[st:st+CHUNK_SIZE]:
+                words = self.hex_words(pat, addr_map)
+                row = []
+                for idx, lsb, width, is_signed in specs:
+                    val = (words[idx] >> lsb) & ((1 << width) - 1)
+                    if is_signed and val >> (width - 1):
+                        val -= 1 << width
+                    row.append(val)
+                rows.append(row)
+            yield rows
+
+    def matrix_parser(self, matrix_fp: str):
+        """Pattern parser for the patterns x fields matrix (csv/npy/npz)"""
+        fields = [reg.name.lower() for reg in self.matrix_fields()]
+        fields, pat_names, rows = import_matrix(matrix_fp, fields)
+        reg_names = [name.upper() for name in fields]
+
+        for pat_name, row in zip(pat_names, rows):
+            pat_regs = {}
+            for reg_name, val in zip(reg_names, row):
+                if isinstance(val, float):
+                    if not val.is_integer():
+                        print('-' * 60)
+                        print("RegisterValueError:")
+                        print("pattern:  {}".format(pat_name))
+                        print("register: {}".format(reg_name))
+                        print("value:    {} (not an integer)".format(val))
+                        print('-' * 60)
+                        raise SyntaxError("RegisterValueError")
+                    val = int(val)
+                pat_regs[reg_name] = str(val)
+            self.pat_list.append(self.ini_pat(pat_name, pat_regs))
+
+    def matrix_dump(self, pat_dir, pat_name=None, pat_ext=None, info_dump=True):
+        """Dump patterns as the patterns x fields matrix (csv/npy/npz)
+
+        Rows are packed and written by chunks, register values are 
+        validated as the hex dump.
+        """
+        pname = pat_name if pat_name else 'register'
+        fields = self.matrix_fields()
+        export_matrix(pat_dir / (pname + (pat_ext if pat_ext else '.npz')),
+                      [reg.name.lower() for reg in fields],
+                      [pat.name for pat in self.pat_list],
+                      self.matrix_rows(self.pat_list, fields))
+
+        if info_dump:
+            print(f"\n=== Number of pattern generated: {len(self.pat_list)}\n")
+
     def hex_dump(self, pat_dir, pat_name=None, pat_ext=None, is_force=False, 
-                 info_dump=True):
-        """Dump pattern with hex format"""
+                 info_dump=True, rsv_max=None, check_algo: str=None, 
+                 is_sidecar=False):
+        """Dump pattern with hex format
+
+        Reserved gaps longer than 'rsv_max' words are skipped instead of 
+        being filled with zero words. The 'check_algo' checksum of words is 
+        appended as a trailer record, or saved to the sidecar manifest of 
+        the pattern directory if 'is_sidecar'.
+        """
         if not pat_ext:
             pat_ext = '.pat'
 
+        addr_map = list(self.addr_map(rsv_max))
         pat_cnt = 0
         pat_ignore = 0
+        sums = {}
         is_batch = len(self.pat_list) > 1
 
-        for pat in self.pat_list:
-            if pat_name:
-                pname = pat_name + str(pat_cnt) if is_batch else pat_name
-            else:
-                pname = pat.name
+        with self.open_sink(pat_dir) as sink:
+            for pat in self.pat_list:
+                if pat_name:
+                    pname = pat_name + str(pat_cnt) if is_batch else pat_name
+                else:
+                    pname = pat.name
 
-            pat_path = pat_dir / (pname + pat_ext)
+                pat_path = pat_dir / (pname + pat_ext)
 
-            if pat_path.exists() and not is_force:
-                if input(f"{pname+pat_ext} existed, overwrite? (y/n) ").lower() != 'y':
-                    print('Ignore')
-                    pat_cnt += 1
-                    pat_ignore += 1
-                    continue
+                if pat_path.exists() and not is_force:
+                    if input(f"{pname+pat_ext} existed, overwrite? (y/n) ").lower() != 'y':
+                        print('Ignore')
+                        pat_cnt += 1
+                        pat_ignore += 1
+                        continue
 
-            with open(pat_path, 'w') as f:
-                for addr in range(0, max(self.reg_table.keys()) + 4, 4):
-                    word_val = 0
-                    try:
-                        for reg in self.reg_table[addr].regs:
-                            bits = reg.msb - reg.lsb + 1
-                            mask = (1 << bits) - 1
-                            is_reg_exist = reg.name in pat.regs
-
-                            if reg.is_access:
-                                if is_reg_exist:
-                                    try:
-                                        reg_val = str2int(pat.regs[reg.name], 
-                                                          reg.is_signed, 
-                                                          bits)
-                                    except Exception as e:
-                                        print('-' * 60)
-                                        print("RegisterValueError:")
-                                        print("pattern:  {}".format(pat.name))
-                                        print("register: {}".format(reg.name))
-                                        print('-' * 60)
-                                        raise SyntaxError("RegisterValueError") 
-                                else:
-                                    print(f"[Warning] '{reg.name.lower()}' is not found in pattern '{pat.name}', use default value.")
-                                    reg_val = reg.init_val
-                            else:
-                                reg_val = reg.init_val
+                text, sums[pname + pat_ext] = self.hex_text(pat, addr_map, check_algo, 
+                                                            is_sidecar)
+                sink.write(pname + pat_ext, text)
+                pat_cnt += 1
 
-                            word_val += (reg_val & mask) << reg.lsb
+        self.hex_sidecar(pat_dir, sums, check_algo, is_sidecar)
 
-                        f.write("{:04x}{:08x}\n".format(addr, word_val))
-                    except Exception as e:
-                        if str(e) == 'RegisterValueError':
-                            raise e
-                        f.write("{:04x}{:08x}\n".format(addr, 0))
-            pat_cnt += 1
+        if info_dump:
+            print()
+            print(f"=== Number of pattern generated: {pat_cnt - pat_ignore}")
+            print(f"=== Number of pattern ignored:   {pat_ignore}")
+            print()
+
+    def hex_text(self, pat: Pat, addr_map: list, check_algo: str=None, 
+                 is_sidecar=False) -> tuple:
+        """Render one hex pattern with the checksum, return (text, sidecar_sum)
+
+        'sidecar_sum' is None unless the checksum is saved to the sidecar.
+        """
+        words = self.hex_words(pat, addr_map)
+        text = self.hex_render(pat, addr_map, words)
+        if check_algo and not is_sidecar:
+            text += trailer(words, check_algo)
+        return text, checksum(words, check_algo) if check_algo and is_sidecar else None
+
+    def hex_sidecar(self, pat_dir, sums: dict, check_algo: str=None, 
+                    is_sidecar=False):
+        """Update the sidecar manifest for re-written hex files {name: sum}"""
+        if check_algo and is_sidecar:
+            save_sidecar(pat_dir, check_algo, sums)
+        else:
+            drop_sidecar(pat_dir, list(sums))
+
+    def hex_render(self, pat: Pat, addr_map: list=None, words: array=None) -> str:
+        """Render one pattern with hex format"""
+        if addr_map is None:
+            addr_map = list(self.addr_map())
+        if words is None:
+            words = self.hex_words(pat, addr_map)
+
+        return ''.join(["{:04x}{:08x}\n".format(addr, word_val) 
+                        for addr, word_val in zip(self.hex_addrs(addr_map), words)])
+
+    def seq_dump(self, pat_dir, pat_name=None, pat_ext=None, is_force=False, 
+                 info_dump=True, is_delta=False, is_reorder=False, 
+                 base_words: array=None, burst: tuple=None) -> array:
+        """Dump patterns with write sequence format
+
+        Each pattern writes the words differ from the reset image, or from 
+        the previous pattern in delta mode (the first one from 'base_words', 
+        the reset image by default). Patterns are re-ordered by greedy 
+        nearest neighbor of the word distance with 'is_reorder', and the 
+        sequence is listed in 'seq.list'. Return the last image.
+
+        Writes are coalesced into burst transactions if 'burst' 
+        (max_len, align) is given.
+        """
+        if not pat_ext:
+            pat_ext = '.seq' if burst is None else '.bst'
+
+        addr_map = list(self.addr_map(rsv_max=0))
+        addrs = self.hex_addrs(addr_map)
+        reset_words = self.reset_words(addr_map)
+        if base_words is None:
+            base_words = reset_words
+
+        images = [self.hex_words(pat, addr_map) for pat in self.pat_list]
+        if is_delta and is_reorder:
+            order = greedy_order(images, base_words)
+            self.pat_list = [self.pat_list[i] for i in order]
+            images = [images[i] for i in order]
+
+        pat_cnt = 0
+        pat_ignore = 0
+        write_cnt = 0
+        trans_cnt = 0
+        seq_list = []
+        is_batch = len(self.pat_list) > 1
+
+        with self.open_sink(pat_dir) as sink:
+            for pat, words in zip(self.pat_list, images):
+                if pat_name:
+                    pname = pat_name + str(pat_cnt) if is_batch else pat_name
+                else:
+                    pname = pat.name
+
+                pat_path = pat_dir / (pname + pat_ext)
+
+                if pat_path.exists() and not is_force:
+                    if input(f"{pname+pat_ext} existed, overwrite? (y/n) ").lower() != 'y':
+                        print('Ignore')
+                        pat_cnt += 1
+                        pat_ignore += 1
+                        continue
+
+                ref_words = base_words if is_delta else reset_words
+                if burst is None:
+                    seq = self.seq_render(addrs, words, ref_words)
+                    write_cnt += seq.count('\n')
+                else:
+                    runs = burst_runs(addrs, words, ref_words, *burst)
+                    seq = self.burst_render(addrs, words, runs)
+                    write_cnt += sum([length for _, length in runs])
+                    trans_cnt += len(runs)
+
+                sink.write(pname + pat_ext, seq)
+                pat_cnt += 1
+                seq_list.append(pname + pat_ext)
+                base_words = words
+
+            if is_delta:
+                sink.write('seq.list', ''.join([f"{seq_fp}\n" for seq_fp in seq_list]))
 
         if info_dump:
             print()
             print(f"=== Number of pattern generated: {pat_cnt - pat_ignore}")
             print(f"=== Number of pattern ignored:   {pat_ignore}")
+            print(f"=== Number of word written:      {write_cnt}")
+            if burst is not None:
+                print(f"=== Number of burst transaction: {trans_cnt}")
             print()
 
+        return base_words
+
+    def seq_render(self, addrs: array, words: array, base_words: array) -> str:
+        """Render the ordered write list of words differ from the base image"""
+        return ''.join(["{:04x}{:08x}\n".format(addr, word_val)
+                        for addr, word_val, base_val in zip(addrs, words, base_words)
+                        if word_val != base_val])
+
+    def burst_render(self, addrs: array, words: array, runs: list) -> str:
+        """Render burst transactions (start address, length, data words)"""
+        return ''.join(["{:04x} {} {}\n".format(
+                            addrs[start], length,
+                            ' '.join(["{:08x}".format(word_val)
+                                      for word_val in words[start:start+length]]))
+                        for start, length in runs])
+
+    def reset_words(self, addr_map: list=None) -> array:
+        """Pack the reset image (initial values) of the hex image
+
+        Inaccessible fields always take initial values in packed patterns 
+        and reserved words are zero, so they never differ from the reset 
+        image.
+        """
+        if addr_map is None:
+            addr_map = list(self.addr_map())
+        if self.wide_addrs:
+            self.word_width_error()
+
+        words = array('I')
+        for addr, end_addr, reg_list in addr_map:
+            if reg_list is None:
+                if end_addr == addr:
+                    words.append(0)
+                continue
+
+            word_val = 0
+            for reg, lsb, mask, _ in self.field_index[addr]:
+                word_val += (reg.init_val & mask) << lsb
+            words.append(word_val)
+
+        return words
+
+    def word_width_error(self):
+        """Reject the table with fields out of the 32-bit packed word"""
+        print('-' * 60)
+        print("WordWidthError:")
+        for addr in self.wide_addrs:
+            for fld in self.field_index[addr]:
+                if fld.word_mask >> 32:
+                    print("register: {} [{}:{}] at 0x{:04x}".format(
+                          fld.reg.name.lower(), fld.reg.msb, fld.reg.lsb, addr))
+        print('-' * 60)
+        raise ValueError("WordWidthError")
+
+    def hex_addrs(self, addr_map: list) -> array:
+        """Get word addresses of the hex image"""
+        return array('I', [addr for addr, end_addr, _ in addr_map if addr == end_addr])
+
+    def hex_words(self, pat: Pat, addr_map: list=None) -> array:
+        """Pack one pattern to the word array of the hex image"""
+        if addr_map is None:
+            addr_map = list(self.addr_map())
+        if self.wide_addrs:
+            self.word_width_error()
+
+        words = array('I')
+        for addr, end_addr, reg_list in addr_map:
+            if reg_list is None:
+                if end_addr == addr:
+                    words.append(0)
+                continue
+
+            word_val = 0
+            for reg, lsb, mask, _ in self.field_index[addr]:
+                bits = reg.msb - reg.lsb + 1
+                is_reg_exist = reg.name in pat.regs
+
+                if reg.is_access:
+                    if is_reg_exist:
+                        try:
+                            reg_val = str2int(pat.regs[reg.name], 
+                                              reg.is_signed, 
+                                              bits)
+                        except Exception as e:
+                            print('-' * 60)
+                            print("RegisterValueError:")
+                            print("pattern:  {}".format(pat.name))
+                            print("register: {}".format(reg.name))
+                            print('-' * 60)
+                            raise SyntaxError("RegisterValueError") 
+                    else:
+                        self.diag.warn('missing', reg.name, pat.name)
+                        reg_val = reg.init_val
+                else:
+                    reg_val = reg.init_val
+
+                word_val += (reg_val & mask) << lsb
+
+            words.append(word_val)
+
+        return words
+
+    def typed_value(self, reg, value, pat_name: str):
+        """Convert the value of a str/float/int register for comparison"""
+        try:
+            if reg.type == 'float':
+                return float(value)
+            elif reg.type == 'int':
+                return int(value)
+            else:
+                return str(value)
+        except ValueError:
+            print('-' * 60)
+            print("RegisterValueError:")
+            print("pattern:  {}".format(pat_name))
+            print("register: {}".format(reg.name))
+            print('-' * 60)
+            raise SyntaxError("RegisterValueError")
+
+    def dedup_pattern(self, deduper: Deduper=None) -> Deduper:
+        """Remove patterns with the same packed word image
+
+        Non-address registers (str/float/int) are compared by the typed 
+        value. The first pattern of each group is kept, pass the same 
+        deduper to dedup across pattern lists.
+        """
+        if deduper is None:
+            deduper = Deduper()
+
+        addr_map = list(self.addr_map(rsv_max=0))
+        typed_regs = [reg for ini_grp in self.ini_table for reg in ini_grp.regs
+                      if reg.type in ('str', 'float', 'int')]
+
+        ## warnings are reported by the dump, not here
+
+        diag, self.diag = self.diag, Diagnostics()
+        try:
+            uniq_list = []
+            for pat in self.pat_list:
+                typed_vals = {reg.name: self.typed_value(reg, pat.regs.get(reg.name, reg.init_val), pat.name)
+                              for reg in typed_regs}
+                key = image_key(self.hex_words(pat, addr_map).tobytes(), typed_vals)
+                if deduper.add(pat.name, key):
+                    uniq_list.append(pat)
+        finally:
+            self.diag = diag
+
+        self.pat_list = uniq_list
+        return deduper
+
     def xlsx_dump(self, ref_fp : str, pat_dir, pat_name=None, is_force=False, 
                   is_init=False, info_dump=True):
         """Dump pattern with excel format"""
@@ -401,7 +836,15 @@ class PatternList(ReferenceTable):
                 print('Terminal')
                 exit(0)
 
-        pat_cnt = 0
+        wb = self.xlsx_render(ref_fp, self.pat_list, is_init)
+        wb.save(pat_path)
+        wb.close()
+
+        if info_dump:
+            print(f"\n=== Number of pattern generated: {len(self.pat_list)}\n")
+
+    def xlsx_render(self, ref_fp, pats: list, is_init=False):
+        """Render patterns into a copy of the excel table (return workbook)"""
         wb = openpyxl.load_workbook(ref_fp)
         ws = wb.worksheets[0]
 
@@ -424,7 +867,7 @@ class PatternList(ReferenceTable):
                 cell.border = copy.copy(row.border)
                 cell.alignment = copy.copy(row.alignment)
 
-        for pat in self.pat_list:
+        for pat in pats:
             for reg_list in self.reg_table.values():
                 for reg in reg_list.regs:
                     bits = reg.msb - reg.lsb + 1
@@ -433,7 +876,7 @@ class PatternList(ReferenceTable):
                     if not reg.is_access:
                         reg_val = 0
                     elif reg.name not in pat.regs:
-                        print(f"[Warning] '{reg.name}' is not found in pattern '{pat.name}', use default value.")
+                        self.diag.warn('missing', reg.name, pat.name)
                         reg_val = reg.init_val
                     else:
                         try:
@@ -471,19 +914,232 @@ class PatternList(ReferenceTable):
             cell.alignment = copy.copy(row.alignment)
 
             pat_idx += 1
-            pat_cnt += 1
 
-        wb.save(pat_path)
-        wb.close()
-
-        if info_dump:
-            print(f"\n=== Number of pattern generated: {pat_cnt}\n")
+        return wb
 
     def export_table_db(self, db_fp):
-        """Export reference table dtabase (pickle type)"""
+        """Export reference table dtabase (pickle type, compact form)"""
         with open(db_fp, 'wb') as f:
-            pickle.dump(self.reg_table, f)
-            pickle.dump(self.ini_table, f)
+            pickle.dump(RegArray.from_table(self), f, pickle.HIGHEST_PROTOCOL)
+
+    def export_table_sqlite(self, db_fp):
+        """Export reference table database (SQLite type)"""
+        with RegDB(db_fp) as db:
+            db.save_table(self)
+
+
+##############################################################################
+### Sub Function
+
+def table_source(args) -> tuple:
+    """Get (table_fp, table_type) from arguments"""
+    if args.txt_table_fp:
+        return args.txt_table_fp, 'txt'
+    elif args.xlsx_table_fp:
+        return args.xlsx_table_fp, 'xlsx'
+    elif args.xlsx_table_fp2:
+        return args.xlsx_table_fp2, 'xlsx'
+    elif args.sqlite_fp:
+        return args.sqlite_fp, 'sqlite'
+    else:
+        return args.database_fp, 'db'
+
+
+def parse_pattern(pat_list: PatternList, args):
+    """Parse input patterns by arguments"""
+    if args.in_fmt == 'ini':
+        pat_list.ini_parser(args.pat_in_fp, args.is_batch, 
+                            args.start_id, args.end_id) 
+    elif args.in_fmt == 'hex':
+        pat_list.hex_parser(args.pat_in_fp, args.is_batch, 
+                            args.start_id, args.end_id)
+    elif args.in_fmt == 'sqlite':
+        pat_list.sqlite_parser(args.pat_in_fp, args.sql)
+    elif args.in_fmt == 'matrix':
+        pat_list.matrix_parser(args.pat_in_fp)
+    else:
+        pat_list.xlsx_parser(args.pat_in_fp, args.is_batch, 
+                             args.start_id, args.end_id)
+
+
+def dump_pattern(pat_list: PatternList, args, pat_dir, pat_name, pat_ext, 
+                 is_force: bool, info_dump: bool=True):
+    """Dump patterns by arguments"""
+    if args.out_fmt == 'ini':
+        pat_list.ini_dump(pat_dir, pat_name, pat_ext, is_force, info_dump)
+    elif args.out_fmt == 'hex':
+        pat_list.hex_dump(pat_dir, pat_name, pat_ext, is_force, info_dump,
+                          rsv_max=args.rsv_max, check_algo=args.check_algo, 
+                          is_sidecar=args.is_sidecar)
+    elif args.out_fmt == 'sqlite':
+        pat_list.sqlite_dump(pat_dir, pat_name, info_dump)
+    elif args.out_fmt == 'matrix':
+        pat_list.matrix_dump(pat_dir, pat_name, pat_ext, info_dump)
+    elif args.out_fmt == 'seq':
+        pat_list.seq_dump(pat_dir, pat_name, pat_ext, is_force, info_dump,
+                          args.is_delta, args.is_reorder)
+    elif args.out_fmt == 'burst':
+        pat_list.seq_dump(pat_dir, pat_name, pat_ext, is_force, info_dump,
+                          args.is_delta, args.is_reorder,
+                          burst=(args.burst_len, args.burst_align))
+    else:
+        is_init = True if args.xlsx_table_fp2 else False
+
+        if args.xlsx_table_fp:
+            pat_list.xlsx_dump(args.xlsx_table_fp, pat_dir, pat_name, 
+                               is_force, is_init, info_dump)
+        elif args.xlsx_table_fp2:
+            pat_list.xlsx_dump(args.xlsx_table_fp2, pat_dir, pat_name, 
+                               is_force, is_init, info_dump)
+        else:
+            raise TypeError("need an excel register table when output excel file")
+
+
+def watch_pattern(pat_list: PatternList, args, debug_mode: set, 
+                  pat_dir, pat_name, pat_ext, interval: float=1.0):
+    """Watch the table and input patterns, re-convert changed patterns
+
+    Only ini/hex patterns are updated incrementally, other input or output 
+    is re-converted as a whole. When only initial values in the table are 
+    changed, only patterns which use the default value of these registers 
+    are re-converted.
+    """
+    table_fp, table_type = table_source(args)
+    is_incr = args.in_fmt in ('ini', 'hex') and args.out_fmt in ('ini', 'hex')
+
+    if not is_incr:
+        in_fps = [args.pat_in_fp]
+    elif args.is_batch:
+        in_fps = pat_list.batch_list(args.pat_in_fp, args.start_id, args.end_id)
+    else:
+        in_fps = [args.pat_in_fp]
+
+    if not pat_ext:
+        pat_ext = '.ini' if args.out_fmt == 'ini' else '.pat'
+
+    # pat_table = {in_fp: pat, ...}
+    # out_table = {out_path: in_fp, ...}
+    pat_table = dict(zip(in_fps, pat_list.pat_list))
+    out_table = {}
+    addr_map = list(pat_list.addr_map(args.rsv_max))
+
+    def out_path(idx: int, pat: Pat) -> Path:
+        if pat_name:
+            pname = pat_name + str(idx) if len(in_fps) > 1 else pat_name
+        else:
+            pname = pat.name
+        return pat_dir / (pname + pat_ext)
+
+    for idx, in_fp in enumerate(in_fps):
+        out_table[out_path(idx, pat_table[in_fp])] = in_fp
+
+    watch_fps = [table_fp] + in_fps
+    if args.is_batch and is_incr:
+        watch_fps.append(args.pat_in_fp)
+    watcher = FileWatcher(watch_fps)
+
+    def renew_list(old_list: PatternList) -> PatternList:
+        new_list = PatternList(table_fp, table_type, debug_mode)
+        new_list.diag.is_detail = old_list.diag.is_detail
+        new_list.io_jobs = old_list.io_jobs
+        new_list.is_fsync = old_list.is_fsync
+        return new_list
+
+    pat_list.diag.clear()
+    print(f"[INFO] Watching {len(watch_fps)} files, press Ctrl-C to stop.")
+
+    try:
+        while True:
+            time.sleep(interval)
+            if not (changed := watcher.poll()):
+                continue
+
+            try:
+                if not is_incr:
+                    pat_list = renew_list(pat_list)
+                    parse_pattern(pat_list, args)
+                    dump_pattern(pat_list, args, pat_dir, pat_name, pat_ext, 
+                                 is_force=True, info_dump=False)
+                    print(f"[INFO] {len(pat_list.pat_list)} patterns re-converted.")
+                    pat_list.diag.summary()
+                    continue
+
+                dirty_fps = set()
+                is_reread = False
+
+                if table_fp in changed:
+                    new_list = renew_list(pat_list)
+                    reg_names = pat_list.init_diff(new_list)
+                    # hex patterns are decoded by the field layout of the table
+                    is_reread = args.in_fmt == 'hex'
+                    pat_list = new_list
+                    addr_map = list(pat_list.addr_map(args.rsv_max))
+
+                    if reg_names is None:
+                        dirty_fps.update(pat_table.keys())
+                    elif len(reg_names):
+                        fixed_names = {name for name in reg_names
+                                       if name in pat_list.reg_index
+                                       and not pat_list.reg_index[name].is_access}
+                        for in_fp, pat in pat_table.items():
+                            for name in reg_names:
+                                if name not in pat.regs or name in fixed_names:
+                                    dirty_fps.add(in_fp)
+                                    break
+
+                if args.is_batch and args.pat_in_fp in changed:
+                    in_fps = pat_list.batch_list(args.pat_in_fp, 
+                                                 args.start_id, args.end_id)
+                    watcher.update([table_fp, args.pat_in_fp] + in_fps)
+                    pat_table = {in_fp: pat_table.get(in_fp) for in_fp in in_fps}
+
+                for in_fp, pat in pat_table.items():
+                    if pat is None or in_fp in changed or is_reread:
+                        if Path(in_fp).exists():
+                            read = pat_list.ini_read if args.in_fmt == 'ini' else pat_list.hex_read
+                            pat_table[in_fp] = read(in_fp)
+                            dirty_fps.add(in_fp)
+                        else:
+                            pat_table[in_fp] = None
+                            print(f"[Warning] '{in_fp}' is not found, skip.")
+
+                pat_list.pat_list = [pat for pat in pat_table.values() if pat is not None]
+
+                new_out_table = {}
+                for idx, in_fp in enumerate(in_fps):
+                    if pat_table[in_fp] is not None:
+                        new_out_table[out_path(idx, pat_table[in_fp])] = in_fp
+
+                del_paths = out_table.keys() - new_out_table.keys()
+                for path in del_paths:
+                    path.unlink(missing_ok=True)
+                if args.out_fmt == 'hex' and del_paths:
+                    drop_sidecar(pat_dir, [path.name for path in del_paths])
+
+                out_cnt = 0
+                sums = {}
+                with pat_list.open_sink(pat_dir) as sink:
+                    for path, in_fp in new_out_table.items():
+                        if in_fp in dirty_fps or out_table.get(path) != in_fp:
+                            pat = pat_table[in_fp]
+                            if args.out_fmt == 'ini':
+                                sink.write(path.name, pat_list.ini_render(pat))
+                            else:
+                                text, sums[path.name] = pat_list.hex_text(
+                                        pat, addr_map, args.check_algo, args.is_sidecar)
+                                sink.write(path.name, text)
+                            out_cnt += 1
+                if sums:
+                    pat_list.hex_sidecar(pat_dir, sums, args.check_algo, args.is_sidecar)
+
+                out_table = new_out_table
+                print(f"[INFO] {out_cnt} patterns re-converted.")
+                pat_list.diag.summary()
+                pat_list.diag.clear()
+            except Exception as e:
+                print(f"[Error] {type(e).__name__}: {e}")
+    except KeyboardInterrupt:
+        print()
 
 
 ##############################################################################
@@ -527,14 +1183,27 @@ def main():
 
                         Batch mode, convert settings from the 6th column to 8th column in the excel table.
 
+                    @: %(prog)s -t table.txt ini sqlite <src_list_path> -b --pat corpus
+
+                        Batch mode, write the table and all settings to the SQLite database 'corpus.db'.
+
+                    @: %(prog)s -t table.txt ini matrix <src_list_path> -b --ext csv
+
+                        Batch mode, export all settings as a patterns x fields matrix 'register.csv'.
+
                 Convert to ini/hex with any format of reference table is permitted, but convert
                 to excel format by excel-style reference table is necessary.
                 """))
 
-    parser.add_argument('in_fmt', metavar='format_in', choices=['ini', 'hex', 'xlsx'],
-                                    help="input format (choices: ini/hex/xlsx)") 
-    parser.add_argument('out_fmt', metavar='format_out', choices=['ini', 'hex', 'xlsx'], 
-                                    help="output format (choices: ini/hex/xlsx)") 
+    parser.add_argument('in_fmt', metavar='format_in', 
+                                    choices=['ini', 'hex', 'xlsx', 'sqlite', 'matrix'],
+                                    help="input format (choices: ini/hex/xlsx/sqlite/matrix)") 
+    parser.add_argument('out_fmt', metavar='format_out', 
+                                    choices=['ini', 'hex', 'xlsx', 'sqlite', 'matrix', 'seq', 'burst'], 
+                                    help=textwrap.dedent("""\
+                                    output format (choices: ini/hex/xlsx/sqlite/matrix/seq/burst)
+                                    seq: ordered address/data writes differ from reset
+                                    burst: seq writes coalesced into 'addr len data...' bursts""")) 
     parser.add_argument('pat_in_fp', metavar='pattern_in',
                                     help="input pattern path") 
 
@@ -549,13 +1218,19 @@ def main():
     table_gparser.add_argument('-X', dest='xlsx_table_fp2', metavar='<path>',
                                         help=textwrap.dedent("""\
                                         use excel-style reference table (new table create)"""))
-    # table_gparser.add_argument('-d', dest='database_fp', metavar='<path>',
-    #                                     help=textwrap.dedent("""\
-    #                                     use pre-parsed reference table database (pickle type)"""))
+    table_gparser.add_argument('-d', dest='database_fp', metavar='<path>',
+                                        help=textwrap.dedent("""\
+                                        use pre-parsed reference table database (pickle type)"""))
+    table_gparser.add_argument('-D', dest='sqlite_fp', metavar='<path>',
+                                        help=textwrap.dedent("""\
+                                        use reference table database (SQLite type)"""))
 
-    # parser.add_argument('-p', dest='pickle_out_fp', metavar='<path>',
-    #                             help=textwrap.dedent("""\
-    #                             export reference table database (pickle type)"""))
+    parser.add_argument('-p', dest='pickle_out_fp', metavar='<path>',
+                                help=textwrap.dedent("""\
+                                export reference table database (pickle type)"""))
+    parser.add_argument('-P', dest='sqlite_out_fp', metavar='<path>',
+                                help=textwrap.dedent("""\
+                                export reference table database (SQLite type)"""))
 
     parser.add_argument('-b', dest='is_batch', action='store_true', 
                                 help="enable batch mode")
@@ -571,7 +1246,51 @@ def main():
     parser.add_argument('--pat', dest='cus_pat', metavar='<path>',
                                     help="custom dump pattern name")
     parser.add_argument('--ext', dest='cus_ext', metavar='<ext>',
-                                    help="custom dump file extension (excel ignore)")
+                                    help=textwrap.dedent("""\
+                                    custom dump file extension (excel ignore),
+                                    matrix: csv/npy/npz (default: npz)"""))
+    parser.add_argument('--sql', dest='sql', metavar='<query>',
+                                    help=textwrap.dedent("""\
+                                    select input patterns of SQLite database by the query 
+                                    of pattern names (sqlite input only)"""))
+    parser.add_argument('--check', dest='is_check', action='store_true',
+                                    help=textwrap.dedent("""\
+                                    validate all patterns first, write nothing if any fails
+                                    (or any warning is reported with --werror)"""))
+    parser.add_argument('--diag', dest='diag_fp', metavar='<path>',
+                                    help="export the full warning report (json)")
+    parser.add_argument('--werror', dest='is_werror', action='store_true',
+                                    help="exit with error if any warning is reported")
+    parser.add_argument('--delta', dest='is_delta', action='store_true',
+                                    help=textwrap.dedent("""\
+                                    seq output writes words differ from the previous pattern,
+                                    the sequence is listed in 'seq.list'"""))
+    parser.add_argument('--io-jobs', dest='io_jobs', metavar='<num>', type=int, default=0,
+                                    help="write pattern files by threads (default: 0, synchronous)")
+    parser.add_argument('--fsync', dest='is_fsync', action='store_true',
+                                    help="fsync each written pattern file")
+    parser.add_argument('--checksum', dest='check_algo', metavar='<algo>', choices=CHECKSUMS,
+                                    help=textwrap.dedent("""\
+                                    append the checksum trailer to hex patterns
+                                    (choices: crc32/crc16/sum)"""))
+    parser.add_argument('--checksum-file', dest='is_sidecar', action='store_true',
+                                    help=f"save checksums to '{SIDECAR}' instead of trailers (with --checksum)")
+    parser.add_argument('--burst-len', dest='burst_len', metavar='<num>', type=int, default=16,
+                                    help="max words of a burst transaction (default: 16)")
+    parser.add_argument('--burst-align', dest='burst_align', metavar='<num>', type=int, default=0,
+                                    help="burst boundary in words, 0 for none (default: 0)")
+    parser.add_argument('--reorder', dest='is_reorder', action='store_true',
+                                    help="re-order patterns to minimize writes (with --delta)")
+    parser.add_argument('--dedup', dest='is_dedup', action='store_true',
+                                    help=textwrap.dedent("""\
+                                    dump unique patterns only (by the packed word image),
+                                    the alias map is exported to 'dedup_alias.json'"""))
+    parser.add_argument('--watch', dest='is_watch', action='store_true',
+                                    help="watch the table and input patterns, re-convert on change")
+    parser.add_argument('--rsv-max', dest='rsv_max', metavar='<num>', type=int,
+                                    help=textwrap.dedent("""\
+                                    max reserved words filled per address gap (hex only),
+                                    longer gaps are skipped (default: no limit)"""))
 
     args, args_dbg = parser.parse_known_args()
 
@@ -588,6 +1307,31 @@ def main():
     except Exception:
         pass
 
+    if args.is_dedup and args.is_watch:
+        print("[Error] dedup mode can't be used with the watch mode.")
+        exit(1)
+
+    if args.burst_len < 1 or args.burst_align < 0:
+        print("[Error] invalid burst length/alignment.")
+        exit(1)
+
+    if args.is_sidecar and not args.check_algo:
+        print("[Error] checksum file mode can't be used without the checksum algorithm.")
+        exit(1)
+
+    if (args.is_delta or args.is_reorder) and args.out_fmt not in ('seq', 'burst'):
+        print("[Error] delta/reorder mode is only for the seq/burst output.")
+        exit(1)
+
+    if args.is_reorder and not args.is_delta:
+        print("[Error] reorder mode can't be used without the delta mode.")
+        exit(1)
+
+    for db_fp in (args.sqlite_fp, args.pat_in_fp if args.in_fmt == 'sqlite' else None):
+        if db_fp and not Path(db_fp).is_file():
+            print(f"[Error] SQLite database '{db_fp}' is not found.")
+            exit(1)
+
     ## Parser register table
 
     if args.txt_table_fp:
@@ -596,26 +1340,39 @@ def main():
         pat_list = PatternList(args.xlsx_table_fp, 'xlsx', debug_mode)
     elif args.xlsx_table_fp2:
         pat_list = PatternList(args.xlsx_table_fp2, 'xlsx', debug_mode)
-    # else:
-    #     pat_list = PatternList(args.database_fp, 'db', debug_mode)
+    elif args.sqlite_fp:
+        pat_list = PatternList(args.sqlite_fp, 'sqlite', debug_mode)
+    else:
+        pat_list = PatternList(args.database_fp, 'db', debug_mode)
+
+    pat_list.diag.is_detail = args.diag_fp is not None
+    pat_list.io_jobs = args.io_jobs
+    pat_list.is_fsync = args.is_fsync
 
     ## Only dump reference table database
 
-    # if args.pickle_out_fp:
-    #     pat_list.export_table_db(args.pickle_out_fp)
-    #     return 0
+    if args.pickle_out_fp or args.sqlite_out_fp:
+        if args.pickle_out_fp:
+            pat_list.export_table_db(args.pickle_out_fp)
+        if args.sqlite_out_fp:
+            pat_list.export_table_sqlite(args.sqlite_out_fp)
+        return 0
 
     ## Parse input pattern
 
-    if args.in_fmt == 'ini':
-        pat_list.ini_parser(args.pat_in_fp, args.is_batch, 
-                            args.start_id, args.end_id) 
-    elif args.in_fmt == 'hex':
-        pat_list.hex_parser(args.pat_in_fp, args.is_batch, 
-                            args.start_id, args.end_id)
-    else:
-        pat_list.xlsx_parser(args.pat_in_fp, args.is_batch, 
-                             args.start_id, args.end_id)
+    parse_pattern(pat_list, args)
+
+    if args.is_check and (pat_list.check_pattern() 
+                          or (args.is_werror and len(pat_list.diag))):
+        pat_list.diag.summary()
+        if args.diag_fp:
+            pat_list.diag.export_report(args.diag_fp)
+        print("[Error] pattern check failed, nothing is written.")
+        return 1
+
+    if args.is_dedup:
+        deduper = pat_list.dedup_pattern()
+        print(f"[INFO] {len(deduper.alias)} duplicated patterns removed.")
 
     ## Dump pattern
 
@@ -625,7 +1382,7 @@ def main():
             shutil.rmtree(pat_dir) if pat_dir.is_dir() else pat_dir.unlink()
         pat_dir.mkdir()
     else:
-        if not args.is_batch or args.out_fmt == 'xlsx':
+        if not args.is_batch or args.out_fmt in ('xlsx', 'sqlite', 'matrix'):
             if (pat_dir := Path(args.cus_dir)).resolve() != Path().resolve():
                 if pat_dir.exists():
                     if (not args.is_force 
@@ -653,21 +1410,19 @@ def main():
     except Exception:
         pat_ext = None
 
-    if args.out_fmt == 'ini':
-        pat_list.ini_dump(pat_dir, pat_name, pat_ext, args.is_force)
-    elif args.out_fmt == 'hex':
-        pat_list.hex_dump(pat_dir, pat_name, pat_ext, args.is_force)
-    else:
-        is_init = True if args.xlsx_table_fp2 else False
+    dump_pattern(pat_list, args, pat_dir, pat_name, pat_ext, args.is_force)
 
-        if args.xlsx_table_fp:
-            pat_list.xlsx_dump(args.xlsx_table_fp, pat_dir, pat_name, 
-                               args.is_force, is_init)
-        elif args.xlsx_table_fp2:
-            pat_list.xlsx_dump(args.xlsx_table_fp2, pat_dir, pat_name, 
-                               args.is_force, is_init)
-        else:
-            raise TypeError("need an excel register table when output excel file")
+    if args.is_dedup:
+        deduper.export_alias(pat_dir / 'dedup_alias.json')
+
+    pat_list.diag.summary()
+    if args.diag_fp:
+        pat_list.diag.export_report(args.diag_fp)
+    if args.is_werror and len(pat_list.diag):
+        return 1
+
+    if args.is_watch:
+        watch_pattern(pat_list, args, debug_mode, pat_dir, pat_name, pat_ext)
 
 
 if __name__ == '__main__':
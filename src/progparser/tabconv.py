@@ -54,6 +54,14 @@ def main():
 
     parser.add_argument('-i', dest='is_init', action='store_true', 
                                 help="create initial pattern")
+    parser.add_argument('-c', dest='is_check', action='store_true', 
+                                help="check register layout (overlap/range/name)")
+    parser.add_argument('--gap', dest='is_gap', action='store_true', 
+                                help="list words with unused bits in the layout check")
+    parser.add_argument('-r', dest='rsv_max', metavar='<num>', type=int,
+                                help=textwrap.dedent("""\
+                                max reserved rows expanded per address gap, longer gaps
+                                are collapsed to a range row (default: no limit)"""))
 
     args, args_dbg = parser.parse_known_args()
 
@@ -74,12 +82,23 @@ def main():
 
     pat_list = RegisterTable(args.table_fp, args.in_type, debug_mode)
 
+    # Check register layout
+
+    if args.is_check:
+        issues = pat_list.check_layout(is_gap=True)
+        gap_cnt = len([kind for kind, *_ in issues if kind == 'gap'])
+        for kind, addr, msg in issues:
+            if kind != 'gap' or args.is_gap:
+                print(f"[{kind.capitalize()}] {addr:#06x}: {msg}")
+        if gap_cnt and not args.is_gap:
+            print(f"[INFO] {gap_cnt} words have unused bits (list by --gap).")
+
     # Dump register table
 
     if args.out_type == 'txt':
         pat_list.txt_export(args.is_init)
     else:
-        pat_list.xlsx_export(args.is_init, is_rsv_ext=True)
+        pat_list.xlsx_export(args.is_init, is_rsv_ext=True, rsv_max=args.rsv_max)
 #}}}
 
 if __name__ == '__main__':
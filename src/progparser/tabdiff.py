@@ -40,17 +40,13 @@ class CompareTable(ReferenceTable):
     #{{{
         max_reg_len = 0
         err_reg_list = []
-        l_max_addr = max(self.reg_table.keys())
-        r_max_addr = max(other.reg_table.keys())
-        max_addr = l_max_addr if l_max_addr > r_max_addr else r_max_addr
-
-        for addr in range(0, max_addr+4, 4):
-            l_hit = addr in self.reg_table
-            r_hit = addr in other.reg_table
+        for addr in sorted(self.field_index.keys() | other.field_index.keys()):
+            l_hit = addr in self.field_index
+            r_hit = addr in other.field_index
             if l_hit and r_hit:
-                l_reg_dict = {reg.lsb: reg for reg in sorted(self.reg_table[addr].regs, key=lambda reg: reg.lsb)}
-                r_reg_dict = {reg.lsb: reg for reg in sorted(other.reg_table[addr].regs, key=lambda reg: reg.lsb)}
-                for lsb in range(0, 32):
+                l_reg_dict = {fld.lsb: fld.reg for fld in self.field_index[addr]}
+                r_reg_dict = {fld.lsb: fld.reg for fld in other.field_index[addr]}
+                for lsb in sorted(l_reg_dict.keys() | r_reg_dict.keys()):
                     l_hit = lsb in l_reg_dict
                     r_hit = lsb in r_reg_dict
                     if l_hit and r_hit:
@@ -80,13 +76,13 @@ class CompareTable(ReferenceTable):
                             if (reg_len := len(reg.name)) > max_reg_len:
                                 max_reg_len = reg_len
             elif l_hit:
-                for reg in sorted(self.reg_table[addr].regs, key=lambda reg: reg.lsb):
+                for reg in [fld.reg for fld in self.field_index[addr]]:
                     if reg.name != 'RESERVED':
                         err_reg_list.append(('l', reg))
                         if (reg_len := len(reg.name)) > max_reg_len:
                             max_reg_len = reg_len
             elif r_hit:
-                for reg in sorted(other.reg_table[addr].regs, key=lambda reg: reg.lsb):
+                for reg in [fld.reg for fld in other.field_index[addr]]:
                     if reg.name != 'RESERVED':
                         err_reg_list.append(('r', reg))
                         if (reg_len := len(reg.name)) > max_reg_len:
@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+"""
+Multi-transform editor for the excel-style table
+"""
+import argparse
+import sys
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import openpyxl
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from progparser import __version__
+
+PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
+
+GREY_RGB = 'ff808080'
+PAT_COL_ST = 6
+
+### Function ###
+
+def table_rows(ws) -> tuple:
+    """Get the register row range (start_row, end_row)"""  #{{{
+    addr_col = tuple(ws.iter_cols(1, 1, None, None, True))[0]
+    return addr_col.index('ADDR') + 2, addr_col.index('none') + 1
+#}}}
+
+def rsv_row_ranges(ws, col_idx: int) -> list:
+    """Get reserved row ranges [(start_row, end_row), ...] by one column"""  #{{{
+    start_row, end_row = table_rows(ws)
+    col = tuple(ws.iter_cols(col_idx, col_idx, start_row, end_row-1, True))[0]
+
+    row_ranges = []
+    for row_idx, value in enumerate(col, start=start_row):
+        if str(value).lower() != 'reserved':
+            continue
+        if len(row_ranges) and row_ranges[-1][1] == row_idx - 1:
+            row_ranges[-1][1] = row_idx
+        else:
+            row_ranges.append([row_idx, row_idx])
+
+    return row_ranges
+#}}}
+
+def is_grey(cell) -> bool:
+    """Check if the font color of the cell is grey"""  #{{{
+    try:
+        return cell.font.color.rgb.lower() == GREY_RGB
+    except Exception:
+        return False
+#}}}
+
+def strip_pat(ws):
+    """Strip all pattern columns"""  #{{{
+    if ws.max_column >= PAT_COL_ST:
+        ws.delete_cols(PAT_COL_ST, ws.max_column)
+#}}}
+
+def renum_pat(ws):
+    """Re-number pattern columns by the column index"""  #{{{
+    for col_idx in range(PAT_COL_ST, ws.max_column+1):
+        if ws.cell(2, col_idx).value is not None:
+            ws.cell(1, col_idx).value = col_idx
+#}}}
+
+def mask_rsv(ws):
+    """Mask reserved registers with the grey font
+
+    Only the name cell (read back by the table parser) is styled per row,
+    pattern values of each reserved block are greyed by one conditional
+    format range.
+    """  #{{{
+    grey_font = Font(color=GREY_RGB)
+    max_col = ws.max_column
+    last_col = get_column_letter(max_col)
+
+    blocks = []
+    for start_row, end_row in rsv_row_ranges(ws, 5):
+        for row_idx in range(start_row, end_row+1):
+            if is_grey(cell := ws.cell(row_idx, 5)):
+                continue
+            ws.row_dimensions[row_idx].font = grey_font
+            cell.font = grey_font
+            if len(blocks) and blocks[-1][1] == row_idx - 1:
+                blocks[-1][1] = row_idx
+            else:
+                blocks.append([row_idx, row_idx])
+
+    if max_col >= PAT_COL_ST:
+        for start_row, end_row in blocks:
+            ws.conditional_formatting.add(
+                    f"{get_column_letter(PAT_COL_ST)}{start_row}:{last_col}{end_row}",
+                    FormulaRule(formula=['TRUE'], font=grey_font))
+#}}}
+
+def hide_rsv(ws):
+    """Hide reserved registers"""  #{{{
+    for start_row, end_row in rsv_row_ranges(ws, 2):
+        for row_idx in range(start_row, end_row+1):
+            ws.row_dimensions[row_idx].hidden = True
+#}}}
+
+## Transforms are applied in this order regardless of the request order.
+
+TRANSFORMS = {
+    'strip': strip_pat,
+    'renum': renum_pat,
+    'mask':  mask_rsv,
+    'hide':  hide_rsv,
+}
+
+def edit_table(table_fp, transforms, out_fp=None):
+    """Apply transforms to the table with one load and one save"""  #{{{
+    for name in transforms:
+        if name not in TRANSFORMS:
+            raise ValueError(f"unsupported table transform ({name})")
+
+    wb = openpyxl.load_workbook(table_fp)
+    ws = wb.worksheets[0]
+    for name, func in TRANSFORMS.items():
+        if name in transforms:
+            func(ws)
+    wb.save(table_fp if out_fp is None else out_fp)
+    wb.close()
+#}}}
+
+def edit_tables(table_fps, transforms, jobs: int=1):
+    """Apply transforms to multiple tables in parallel"""  #{{{
+    if jobs == 1 or len(table_fps) < 2:
+        for table_fp in table_fps:
+            edit_table(table_fp, transforms)
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [executor.submit(edit_table, table_fp, transforms)
+                       for table_fp in table_fps]
+            for future in futures:
+                future.result()
+#}}}
+
+### Main ###
+
+def main():
+    """Main function"""  #{{{
+    parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawTextHelpFormatter,
+            description=textwrap.dedent("""
+                Edit excel-style tables with multiple transforms in one load/save.
+
+                Transforms are applied in the order: strip -> renum -> mask -> hide.
+                """))
+
+    parser.add_argument('--version', action='version', version=PROG_VERSION)
+    parser.add_argument('table_fps', metavar='table_in', nargs='+',
+                                    help="reference table in")
+
+    parser.add_argument('-H', dest='transforms', action='append_const', const='hide',
+                                help="hide reserved registers")
+    parser.add_argument('-M', dest='transforms', action='append_const', const='mask',
+                                help="mask reserved registers")
+    parser.add_argument('-S', dest='transforms', action='append_const', const='strip',
+                                help="strip all pattern columns")
+    parser.add_argument('-N', dest='transforms', action='append_const', const='renum',
+                                help="re-number pattern columns")
+    parser.add_argument('-j', dest='jobs', metavar='<num>', type=int, default=None,
+                                help="number of parallel jobs (default: cpu count)")
+
+    args = parser.parse_args()
+
+    if not args.transforms:
+        parser.error("at least one transform is required")
+
+    edit_tables(args.table_fps, set(args.transforms), args.jobs)
+#}}}
+
+if __name__ == '__main__':
+    sys.exit(main())
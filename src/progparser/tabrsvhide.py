@@ -10,9 +10,8 @@ import sys
 import textwrap
 from pathlib import Path
 
-import openpyxl
-
 from progparser import __version__
+from progparser.tabedit import edit_table
 
 PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
@@ -20,16 +19,7 @@ PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
 def hide_rsv_reg(table_fp):
     """Hide reserved register"""  #{{{
-    wb = openpyxl.load_workbook(table_fp)
-    ws = wb.worksheets[0]
-    addr_col = tuple(ws.iter_cols(1, 1, None, None, True))[0]
-    start_row = addr_col.index('ADDR') + 2
-    end_row = addr_col.index('none') + 1
-    for row_idx in range(start_row, end_row):
-        if str(ws.cell(row_idx, 2).value).lower() == 'reserved':
-            ws.row_dimensions[row_idx].hidden = True
-    wb.save(table_fp)
-    wb.close()
+    edit_table(table_fp, {'hide'})
 #}}}
 
 ### Main ###
@@ -10,10 +10,8 @@ import sys
 import textwrap
 from pathlib import Path
 
-import openpyxl
-from openpyxl.styles import Font
-
 from progparser import __version__
+from progparser.tabedit import edit_table
 
 PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
@@ -21,21 +19,7 @@ PROG_VERSION = f'{Path(__file__).stem} version {__version__}'
 
 def mask_rsv_reg(table_fp):
     """Hide reserved register"""  #{{{
-    GREY_FONT = Font(color='ff808080')
-    wb = openpyxl.load_workbook(table_fp)
-    ws = wb.worksheets[0]
-    addr_col = tuple(ws.iter_cols(1, 1, None, None, True))[0]
-    start_row = addr_col.index('ADDR') + 2
-    end_row = addr_col.index('none') + 1
-    for row_idx in range(start_row, end_row):
-        if str((cell := ws.cell(row_idx, 5)).value).lower() == 'reserved':
-            if cell.font.__getattr__('color').rgb.lower() != 'ff808080':
-                ws.row_dimensions[row_idx].font = GREY_FONT
-                for col_idx in range(5, ws.max_column+1):
-                    if (cell := ws.cell(row_idx, col_idx)).value != None:
-                        cell.font = GREY_FONT
-    wb.save(table_fp)
-    wb.close()
+    edit_table(table_fp, {'mask'})
 #}}}
 
 ### Main ###
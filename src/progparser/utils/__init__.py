@@ -4,6 +4,6 @@
 #
 __all__ = ['ref_table']
 
-from progparser.utils.general import str2int
+from progparser.utils.general import str2int, str2int_column
 
-__all__ += ['str2int']
+__all__ += ['str2int', 'str2int_column']
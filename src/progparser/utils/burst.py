@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Burst transactions of changed words in a packed image
+
+Changed words at contiguous addresses are coalesced into one burst. A
+burst holds 'max_len' words at most and never crosses an 'align' words
+boundary (no boundary if 'align' is 0), e.g. a 1KB boundary of 32-bit
+words is align=256.
+"""
+
+from array import array
+
+
+def burst_runs(addrs: array, words: array, base_words: array, max_len: int,
+               align: int=0) -> list:
+    """Get bursts [(start_idx, length), ...] of words differ from the base"""
+    runs = []
+    start = None
+    for idx, (addr, word_val, base_val) in enumerate(zip(addrs, words, base_words)):
+        if word_val == base_val:
+            start = None
+            continue
+
+        if (start is None
+                or addr != addrs[idx-1] + 4
+                or idx - start >= max_len
+                or (align and not (addr >> 2) % align)):
+            start = idx
+            runs.append([idx, 0])
+        runs[-1][1] += 1
+
+    return [tuple(run) for run in runs]
@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Checksums of packed hex images
+
+Computed over the data words of a hex file in file order (32-bit little
+endian words):
+
+    crc32   zlib CRC-32
+    crc16   CRC-16/CCITT (poly 0x1021, init 0xffff)
+    sum     32-bit additive sum of words
+
+A checksum is appended to the hex file as a trailer record
+
+    // crc32 0x1a2b3c4d
+
+or kept for a whole batch in the sidecar manifest 'checksum.json' of the
+pattern directory.
+"""
+
+import binascii
+import json
+import os
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+
+CHECKSUMS = ('crc32', 'crc16', 'sum')
+
+SIDECAR = 'checksum.json'
+
+
+def checksum(words: array, algo: str) -> int:
+    """Compute the checksum of packed words"""
+    if algo == 'sum':
+        return sum(words) & 0xffffffff
+
+    if words.typecode != 'I' or sys.byteorder != 'little':
+        words = array('I', words)
+        if sys.byteorder != 'little':
+            words.byteswap()
+    data = words.tobytes()
+
+    if algo == 'crc32':
+        return zlib.crc32(data)
+    if algo == 'crc16':
+        return binascii.crc_hqx(data, 0xffff)
+    raise ValueError(f"unsupported checksum ({algo})")
+
+
+def trailer(words: array, algo: str) -> str:
+    """Render the checksum trailer record"""
+    return f"// {algo} 0x{checksum(words, algo):08x}\n"
+
+
+def parse_trailer(line: str) -> tuple:
+    """Parse a trailer record, return (algo, value) or None"""
+    toks = line[2:].split()
+    if len(toks) == 2 and toks[0] in CHECKSUMS:
+        return toks[0], int(toks[1], 16)
+    return None
+
+
+def save_sidecar(pat_dir, algo: str, sums: dict):
+    """Save (merge) checksums {file_name: value} to the sidecar manifest
+
+    A manifest of another algorithm is replaced, checksums of files not
+    re-written are dropped with a warning.
+    """
+    sidecar_fp = os.path.join(pat_dir, SIDECAR)
+    manifest = {'algo': algo, 'checksum': {}}
+    if os.path.exists(sidecar_fp):
+        with open(sidecar_fp, 'r') as f:
+            saved = json.load(f)
+        if saved.get('algo') == algo:
+            manifest = saved
+        elif (stale := [name for name in saved.get('checksum', {}) if name not in sums]):
+            print(f"[Warning] checksum algorithm of '{sidecar_fp}' changed "
+                  f"({saved.get('algo')} -> {algo}), {len(stale)} checksums of "
+                  f"files not re-written are dropped.")
+
+    manifest['checksum'].update({name: f"0x{val:08x}" for name, val in sums.items()})
+    with open(sidecar_fp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def drop_sidecar(pat_dir, names: list):
+    """Drop stale checksums of re-written files from the sidecar manifest"""
+    sidecar_fp = os.path.join(pat_dir, SIDECAR)
+    if not os.path.exists(sidecar_fp):
+        return
+
+    with open(sidecar_fp, 'r') as f:
+        manifest = json.load(f)
+    for name in names:
+        manifest['checksum'].pop(name, None)
+    with open(sidecar_fp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def sidecar_sum(hex_fp) -> tuple:
+    """Get (algo, value) of the hex file from the sidecar manifest or None"""
+    sidecar_fp = os.path.join(os.path.dirname(hex_fp), SIDECAR)
+    try:
+        mtime = os.stat(sidecar_fp).st_mtime_ns
+    except OSError:
+        return None
+
+    algo, sums = load_sidecar(sidecar_fp, mtime)
+    if (val := sums.get(os.path.basename(hex_fp))) is None:
+        return None
+    return algo, val
+
+
+@lru_cache(maxsize=16)
+def load_sidecar(sidecar_fp: str, mtime: int) -> tuple:
+    """Load the sidecar manifest (cached by the modification time)"""
+    with open(sidecar_fp, 'r') as f:
+        manifest = json.load(f)
+    return manifest['algo'], {name: int(val, 16)
+                              for name, val in manifest['checksum'].items()}
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Duplicate pattern detection by the packed word image
+"""
+
+import hashlib
+import json
+
+
+def image_key(words: bytes, typed_vals: dict=None) -> bytes:
+    """Hash key of a packed word image (and non-address register values)"""
+    digest = hashlib.blake2b(words, digest_size=16)
+    for reg_name, value in sorted((typed_vals or {}).items()):
+        digest.update(f"{reg_name}={value}\0".encode())
+    return digest.digest()
+
+
+class Deduper:
+    """Group patterns with the same image key (the first one is kept)"""
+
+    def __init__(self):
+        # seen  = {key: kept_name, ...}
+        # alias = {dup_name: kept_name, ...}
+        self.seen = {}
+        self.alias = {}
+
+    def add(self, pat_name: str, key: bytes) -> bool:
+        """Add one pattern, return True if it is unique"""
+        if (kept_name := self.seen.get(key)) is not None:
+            self.alias[pat_name] = kept_name
+            return False
+        self.seen[key] = pat_name
+        return True
+
+    def groups(self) -> dict:
+        """Get duplicate groups {kept_name: [dup_name, ...], ...}"""
+        groups = {}
+        for dup_name, kept_name in self.alias.items():
+            groups.setdefault(kept_name, []).append(dup_name)
+        return groups
+
+    def export_alias(self, alias_fp):
+        """Export the alias map (json)"""
+        with open(alias_fp, 'w') as f:
+            json.dump(self.alias, f, indent=2)
@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Word distance of packed images for sequential reprogramming
+
+The distance of two images (arrays of 32-bit words) is the number of
+different words (the writes needed to reprogram one to the other).
+
+Images are indexed by {word_val: image_bitset} per word position, the
+matched words of all images to the current one are counted at once by
+bit-sliced addition of the bitsets (one bit plane per counter bit).
+"""
+
+from array import array
+
+from progparser.utils.pat_index import to_bitset
+
+
+def word_sets(images: list) -> list:
+    """Index images to [{word_val: image_bitset}, ...] per word position"""
+    sets = []
+    for word_vals in zip(*images):
+        val_ids = {}
+        for idx, word_val in enumerate(word_vals):
+            val_ids.setdefault(word_val, []).append(idx)
+        sets.append({word_val: to_bitset(ids) for word_val, ids in val_ids.items()})
+    return sets
+
+
+def match_planes(sets: list, words: array, remain: int) -> list:
+    """Count words of remaining images equal to 'words' (bit planes, LSB first)"""
+    planes = []
+    for val_sets, word_val in zip(sets, words):
+        carry = val_sets.get(word_val, 0) & remain
+        for k, plane in enumerate(planes):
+            if not carry:
+                break
+            planes[k], carry = plane ^ carry, plane & carry
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def greedy_order(images: list, start_words: array) -> list:
+    """Order images by greedy nearest neighbor from the start image
+
+    Return image indexes, ties are broken by the original order.
+    """
+    sets = word_sets(images)
+    remain = (1 << len(images)) - 1
+    order = []
+    cur_words = start_words
+    while remain:
+        cand = remain
+        for plane in reversed(match_planes(sets, cur_words, remain)):
+            if (hit := cand & plane):
+                cand = hit
+        idx = (cand & -cand).bit_length() - 1
+        remain ^= 1 << idx
+        order.append(idx)
+        cur_words = images[idx]
+    return order
@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Diagnostics collector
+"""
+
+import json
+from collections import Counter
+
+DIAG_KINDS = {
+    'missing':  "register is not found in pattern, use default value",
+    'unknown':  "register is not found in the table, ignored",
+    'overflow': "value overflows the register width",
+    'sign':     "negative value of the unsigned register",
+    'value':    "value syntax error",
+}
+
+
+class Diagnostics:
+    """Count warnings by kind, register and pattern"""
+
+    def __init__(self, is_detail: bool=False):
+        # reg_cnt = {(kind, reg_name): count, ...}
+        # pat_cnt = {(kind, pat_name): count, ...}
+        # detail  = [(kind, reg_name, pat_name), ...]  (only if is_detail)
+        self.is_detail = is_detail
+        self.kind_cnt = Counter()
+        self.reg_cnt = Counter()
+        self.pat_cnt = Counter()
+        self.detail = []
+
+    def __len__(self) -> int:
+        return sum(self.kind_cnt.values())
+
+    def warn(self, kind: str, reg_name: str, pat_name: str):
+        """Record one warning"""
+        self.kind_cnt[kind] += 1
+        self.reg_cnt[kind, reg_name] += 1
+        self.pat_cnt[kind, pat_name] += 1
+        if self.is_detail:
+            self.detail.append((kind, reg_name, pat_name))
+
+    def merge(self, other):
+        """Merge the records of another collector (e.g. of a worker process)"""
+        self.kind_cnt.update(other.kind_cnt)
+        self.reg_cnt.update(other.reg_cnt)
+        self.pat_cnt.update(other.pat_cnt)
+        if self.is_detail:
+            self.detail.extend(other.detail)
+
+    def clear(self):
+        """Clear all records"""
+        self.kind_cnt.clear()
+        self.reg_cnt.clear()
+        self.pat_cnt.clear()
+        self.detail.clear()
+
+    def summary(self, max_item: int=5):
+        """Print a bounded summary"""
+        if not len(self):
+            return
+
+        print(f"=== Number of warning: {len(self)}")
+        for kind, cnt in self.kind_cnt.most_common():
+            print(f"  [{kind}] {DIAG_KINDS.get(kind, kind)}: {cnt}")
+
+            for label, counter in (('register', self.reg_cnt),
+                                   ('pattern', self.pat_cnt)):
+                items = [(name, num) for (k, name), num in counter.items() if k == kind]
+                items.sort(key=lambda item: item[1], reverse=True)
+                print(f"    {label} ({len(items)}): " + ', '.join(
+                      [f"'{str(name).lower() if label == 'register' else name}' x {num}"
+                       for name, num in items[:max_item]])
+                      + (', ...' if len(items) > max_item else ''))
+        print()
+
+    def export_report(self, report_fp):
+        """Export the full report (json)"""
+        report = {
+            'count': dict(self.kind_cnt),
+            'register': {},
+            'pattern': {},
+            'detail': [list(item) for item in self.detail],
+        }
+        for (kind, reg_name), cnt in self.reg_cnt.items():
+            report['register'].setdefault(kind, {})[reg_name] = cnt
+        for (kind, pat_name), cnt in self.pat_cnt.items():
+            report['pattern'].setdefault(kind, {})[pat_name] = cnt
+
+        with open(report_fp, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -7,8 +7,17 @@
 General function set
 """
 
+from functools import lru_cache
+
+STR2INT_CACHE = 4096
+
+
+@lru_cache(maxsize=STR2INT_CACHE)
 def str2int(str_: str, is_signed: bool=False, bits: int=32) -> int:
-    """Convert string to integer (with HEX check)"""
+    """Convert string to integer (with HEX check)
+
+    Results are memoized by (str_, is_signed, bits), errors are not.
+    """
     if str_.startswith('0x') or str_.startswith('0X') :
         num = int(str_, 16)
         if num >> bits:
@@ -29,3 +38,26 @@ def str2int(str_: str, is_signed: bool=False, bits: int=32) -> int:
             
     return num
 
+
+def str2int_column(strs: list, is_signed: bool=False, bits: int=32) -> list:
+    """Convert a column of strings to integers (as str2int)
+
+    Pure decimal or pure HEX columns are converted and range checked as 
+    a whole, other columns are converted literal by literal.
+    """
+    if all([str_.isdecimal() for str_ in strs]):
+        nums = list(map(int, strs))
+        if nums and max(nums) >> (bits - 1 if is_signed else bits):
+            raise ValueError("number overflow")
+        return nums
+
+    if all([str_[:2] in ('0x', '0X') for str_ in strs]):
+        nums = [int(str_, 16) for str_ in strs]
+        if max(nums) >> bits:
+            raise ValueError("number overflow")
+        if is_signed:
+            sign_bit = 1 << (bits - 1)
+            nums = [num - (sign_bit << 1) if num & sign_bit else num for num in nums]
+        return nums
+
+    return [str2int(str_, is_signed, bits) for str_ in strs]
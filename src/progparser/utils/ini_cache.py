@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+INI pattern parser with a shared parse cache
+
+The cache is shared by batch generation (REF_INI of test plans and the
+reference patterns of the update mode), the size bound limits memory.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from types import MappingProxyType
+
+
+def parse_ini(lines) -> dict:
+    """Parse INI lines to {reg_name: value_str, ...}"""
+    pat_regs = {}
+    for line_no, line in enumerate(lines, start=1):
+        if line.startswith('['):
+            pass
+        elif line.startswith('#'):
+            pass
+        else:
+            toks = line.split()
+            try:
+                if len(toks) and toks[1] == '=':
+                    str_ = ' '.join(toks[2:])
+                    pat_regs[toks[0].upper()] = str_.split('#')[0].strip("\"\' ")
+            except Exception as e:
+                print('-' * 60)
+                print("INIRegParseError: (line: {})".format(line_no))
+                print("syntax of register descriptor:")
+                print("  '<reg_name> = <value> [comment]'")
+                print('-' * 60)
+                raise e
+    return pat_regs
+
+
+class INICache:
+    """Parse cache of INI files keyed by path, size and mtime
+
+    With 'is_hash', a file whose size/mtime changed is re-parsed only if
+    its content hash changed. At most 'max_size' files are kept, the least
+    recently used one is dropped first. Cached maps are read-only, copy
+    them with dict() before overlay.
+    """
+
+    def __init__(self, is_hash: bool=False, max_size: int=64):
+        # cache = {real_path: (stat_key, digest, regs), ...}  (LRU order)
+        self.is_hash = is_hash
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hit_cnt = 0
+        self.miss_cnt = 0
+
+    def read(self, ini_fp) -> MappingProxyType:
+        """Read one INI file through the cache"""
+        path = os.path.realpath(ini_fp)
+        st = os.stat(path)
+        stat_key = (st.st_size, st.st_mtime_ns)
+
+        if (entry := self.cache.get(path)) is not None and entry[0] == stat_key:
+            self.cache.move_to_end(path)
+            self.hit_cnt += 1
+            return entry[2]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        digest = hashlib.blake2b(data, digest_size=16).digest() if self.is_hash else None
+        if entry is not None and digest is not None and entry[1] == digest:
+            self.cache[path] = (stat_key, digest, entry[2])
+            self.cache.move_to_end(path)
+            self.hit_cnt += 1
+            return entry[2]
+
+        # split on '\n' only, splitlines() also breaks at '\x0c', '\x1c', ...
+        regs = MappingProxyType(parse_ini(data.decode().split('\n')))
+        self.cache[path] = (stat_key, digest, regs)
+        self.cache.move_to_end(path)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+        self.miss_cnt += 1
+        return regs
+
+    def clear(self):
+        """Clear the cache"""
+        self.cache.clear()
+
+
+ini_cache = INICache()
+
+
+def read_ini(ini_fp) -> MappingProxyType:
+    """Read one INI file through the shared cache"""
+    return ini_cache.read(ini_fp)
+
+
+def load_ini(ini_fp) -> dict:
+    """Read one INI file through the shared cache (new dict for overlay)"""
+    return dict(ini_cache.read(ini_fp))
@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Pattern corpus as a dense patterns x fields matrix
+
+Columns are the address fields of the table in ini_table order, values
+are signed for signed fields. Supported files:
+
+    .csv    header 'pattern,<field>,...', one pattern per row
+    .npz    'values' (int64), 'fields' and 'patterns' (unicode)
+    .npy    values only (int64), columns must follow the table
+
+NumPy files are written/read with the standard library only (format
+version 1.0), e.g. np.load('register.npz')['values'].
+"""
+
+import ast
+import csv
+import zipfile
+from array import array
+from pathlib import Path
+
+CHUNK_SIZE = 4096
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+NPY_TYPES = {
+    'i1': 'b', 'u1': 'B', 'i2': 'h', 'u2': 'H', 'i4': 'i', 'u4': 'I',
+    'i8': 'q', 'u8': 'Q', 'f4': 'f', 'f8': 'd', 'b1': 'B',
+}
+
+
+def npy_header(descr: str, shape: tuple) -> bytes:
+    """Build the npy (v1.0) header aligned to 64 bytes"""
+    header = repr({'descr': descr, 'fortran_order': False, 'shape': shape})
+    header = header.encode('latin1')
+    pad = 64 - (len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header += b' ' * (pad % 64) + b'\n'
+    return NPY_MAGIC + len(header).to_bytes(2, 'little') + header
+
+
+def write_npy_strs(f, strs: list):
+    """Write a unicode npy array"""
+    width = max([len(str_) for str_ in strs], default=1)
+    f.write(npy_header(f'<U{width}', (len(strs),)))
+    for str_ in strs:
+        f.write(str_.ljust(width, '\0').encode('utf-32-le'))
+
+
+def write_npy_rows(f, row_chunks, shape: tuple):
+    """Write an int64 npy matrix by chunks of rows"""
+    f.write(npy_header('<i8', shape))
+    for rows in row_chunks:
+        f.write(array('q', [val for row in rows for val in row]).tobytes())
+
+
+def read_npy_header(f) -> tuple:
+    """Read the npy header, return (descr, shape, fortran_order)"""
+    if f.read(6) != NPY_MAGIC[:6]:
+        raise ValueError("not a npy file")
+    major = f.read(2)[0]
+    header_len = int.from_bytes(f.read(2 if major == 1 else 4), 'little')
+    header = ast.literal_eval(f.read(header_len).decode('latin1'))
+    return header['descr'], tuple(header['shape']), header['fortran_order']
+
+
+def npy_typecode(descr: str) -> str:
+    """Get the array typecode of a npy numeric data type"""
+    if (typecode := NPY_TYPES.get(descr[1:])) is None:
+        raise ValueError(f"unsupported npy data type ({descr})")
+    return typecode
+
+
+def read_npy_strs(f) -> list:
+    """Read a unicode npy array"""
+    descr, _, _ = read_npy_header(f)
+    if descr[1] != 'U':
+        raise ValueError(f"unsupported npy data type ({descr})")
+    width = int(descr[2:])
+    data = f.read()
+    return [data[i:i+width*4].decode('utf-32-le').rstrip('\0')
+            for i in range(0, len(data), width*4)]
+
+
+def read_npy_rows(f):
+    """Read rows of a 2-D npy matrix by chunks of CHUNK_SIZE rows
+
+    A Fortran-order matrix is read as a whole.
+    """
+    descr, (rows, cols), fortran_order = read_npy_header(f)
+    typecode = npy_typecode(descr)
+    itemsize = array(typecode).itemsize
+    chunk_rows = rows if fortran_order else CHUNK_SIZE
+
+    for st in range(0, rows, chunk_rows):
+        num = min(chunk_rows, rows - st)
+        vals = array(typecode)
+        vals.frombytes(f.read(num * cols * itemsize))
+        if len(vals) != num * cols:
+            raise ValueError("truncated npy file")
+        if descr[0] == '>':
+            vals.byteswap()
+
+        if fortran_order:
+            for r in range(num):
+                yield vals[r::num]
+        else:
+            for r in range(num):
+                yield vals[r*cols:(r+1)*cols]
+
+
+def iter_npy_rows(matrix_fp, member: str=None):
+    """Iterate rows of a npy matrix file (or a member of the npz file)"""
+    if member is None:
+        with open(matrix_fp, 'rb') as f:
+            yield from read_npy_rows(f)
+    else:
+        with zipfile.ZipFile(matrix_fp) as zf, zf.open(member) as f:
+            yield from read_npy_rows(f)
+
+
+def export_matrix(matrix_fp, fields: list, pat_names: list, row_chunks):
+    """Export the matrix (rows are written by chunks)"""
+    matrix_fp = Path(matrix_fp)
+    shape = (len(pat_names), len(fields))
+
+    if matrix_fp.suffix == '.csv':
+        with open(matrix_fp, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['pattern'] + fields)
+            names = iter(pat_names)
+            for rows in row_chunks:
+                writer.writerows([next(names)] + row for row in rows)
+    elif matrix_fp.suffix == '.npy':
+        with open(matrix_fp, 'wb') as f:
+            write_npy_rows(f, row_chunks, shape)
+    elif matrix_fp.suffix == '.npz':
+        with zipfile.ZipFile(matrix_fp, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+            with zf.open('values.npy', 'w', force_zip64=True) as f:
+                write_npy_rows(f, row_chunks, shape)
+            with zf.open('fields.npy', 'w') as f:
+                write_npy_strs(f, fields)
+            with zf.open('patterns.npy', 'w') as f:
+                write_npy_strs(f, pat_names)
+    else:
+        raise ValueError(f"unsupported matrix file ({matrix_fp.name})")
+
+
+def import_matrix(matrix_fp, fields: list) -> tuple:
+    """Import the matrix, return (fields, pat_names, rows)
+
+    Fields of a .npy matrix are the given table fields. Rows of a .npy/.npz
+    matrix are an iterator reading the file by chunks.
+    """
+    matrix_fp = Path(matrix_fp)
+
+    if matrix_fp.suffix == '.csv':
+        with open(matrix_fp, 'r', newline='') as f:
+            reader = csv.reader(f)
+            fields = next(reader)[1:]
+            pat_names = []
+            rows = []
+            for row in reader:
+                pat_names.append(row[0])
+                rows.append(row[1:])
+        return fields, pat_names, rows
+
+    if matrix_fp.suffix == '.npz':
+        member = 'values.npy'
+        with zipfile.ZipFile(matrix_fp) as zf:
+            with zf.open(member) as f:
+                descr, shape, _ = read_npy_header(f)
+            with zf.open('fields.npy') as f:
+                fields = read_npy_strs(f)
+            if 'patterns.npy' in zf.namelist():
+                with zf.open('patterns.npy') as f:
+                    pat_names = read_npy_strs(f)
+            else:
+                pat_names = None
+    elif matrix_fp.suffix == '.npy':
+        member = None
+        with open(matrix_fp, 'rb') as f:
+            descr, shape, _ = read_npy_header(f)
+        pat_names = None
+    else:
+        raise ValueError(f"unsupported matrix file ({matrix_fp.name})")
+
+    npy_typecode(descr)
+    if len(shape) != 2 or shape[1] != len(fields):
+        raise ValueError(f"matrix shape {shape} mismatches {len(fields)} fields")
+
+    if pat_names is None:
+        pat_names = [f"{matrix_fp.stem}_{i}" for i in range(shape[0])]
+
+    return list(fields), pat_names, iter_npy_rows(matrix_fp, member)
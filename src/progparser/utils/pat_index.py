@@ -0,0 +1,233 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Inverted field value index of a pattern corpus
+
+    index.match("group1_var2_1 == 3 && !(group1_var2_2 < 0x10)")
+
+Query syntax: comparisons '<field> <op> <number>' (op: == != < <= > >=)
+combined by '&&', '||', '!' and parentheses. A HEX number is the raw
+bits of the field, e.g. 0xffff of a signed 16-bit field is -1.
+"""
+
+import pickle
+import re
+from array import array
+
+from progparser.utils.general import str2int
+
+TOKEN_RE = re.compile(r"\s*(?:(&&|\|\||==|!=|<=|>=|<|>|!|\(|\))"
+                      r"|([A-Za-z_]\w*)|(-?(?:0[xX][0-9a-fA-F]+|\d+)))")
+
+CMP_OPS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<':  lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>':  lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def to_bitset(ids: list) -> int:
+    """Build the bitset (int) of pattern ids"""
+    if not ids:
+        return 0
+    buf = bytearray((max(ids) >> 3) + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def iter_bits(bitset: int):
+    """Iterate ids of set bits in ascending order"""
+    buf = bitset.to_bytes((bitset.bit_length() + 7) >> 3, 'little')
+    for byte_idx, byte in enumerate(buf):
+        while byte:
+            low = byte & -byte
+            yield (byte_idx << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class PatIndex:
+    """Inverted index {reg_name: {value: pattern_bitset}} of a corpus
+
+    Patterns are identified by the id (bit position) in the order of
+    indexing. A re-indexed pattern keeps its id, a removed id is not
+    reused.
+    """
+
+    def __init__(self, layout: tuple):
+        # layout = ((reg_name, col_idx, lsb, mask, width, is_signed), ...)
+        # stamps = {pat_fp: (size, mtime_ns), ...} of indexed files
+        self.layout = layout
+        self.names = []
+        self.pat_ids = {}
+        self.stamps = {}
+        self.alive = 0
+        self.fields = {reg_name: {} for reg_name, *_ in layout}
+
+    def __len__(self) -> int:
+        return len(self.pat_ids)
+
+    def field_format(self, reg_name: str) -> tuple:
+        """Get (width, is_signed) of a field"""
+        for name, _, _, _, width, is_signed in self.layout:
+            if name == reg_name:
+                return width, is_signed
+        raise ValueError(f"unknown field ({reg_name})")
+
+    @staticmethod
+    def table_layout(table) -> tuple:
+        """Get field layout of packed words (as patverify.pack_pats)"""
+        addrs = table.hex_addrs(list(table.addr_map(rsv_max=0)))
+        layout = []
+        for col_idx, addr in enumerate(addrs):
+            for reg, lsb, mask, _ in table.field_index.get(addr, ()):
+                if reg.name != 'RESERVED':
+                    layout.append((reg.name, col_idx, lsb, mask,
+                                   reg.msb - reg.lsb + 1, reg.is_signed))
+        return tuple(layout)
+
+    def update(self, packs: list):
+        """Add or re-index patterns [(pat_name, words, ...), ...]"""
+        ids = []
+        stale_ids = []
+        for pat_name, *_ in packs:
+            if (pat_id := self.pat_ids.get(pat_name)) is None:
+                pat_id = self.pat_ids[pat_name] = len(self.names)
+                self.names.append(pat_name)
+            else:
+                stale_ids.append(pat_id)
+            ids.append(pat_id)
+
+        if stale_ids:
+            self.clear(to_bitset(stale_ids))
+
+        cols = [array('I', words) for _, words, *_ in packs]
+        for reg_name, col_idx, lsb, mask, width, is_signed in self.layout:
+            val_ids = {}
+            for pat_id, words in zip(ids, cols):
+                val = (words[col_idx] >> lsb) & mask
+                if is_signed and val >> (width - 1):
+                    val -= 1 << width
+                val_ids.setdefault(val, []).append(pat_id)
+
+            val_map = self.fields[reg_name]
+            for val, id_list in val_ids.items():
+                val_map[val] = val_map.get(val, 0) | to_bitset(id_list)
+
+        self.alive |= to_bitset(ids)
+
+    def remove(self, pat_names: list):
+        """Remove patterns from the index"""
+        ids = [self.pat_ids.pop(pat_name) for pat_name in pat_names
+               if pat_name in self.pat_ids]
+        for pat_id in ids:
+            self.names[pat_id] = None
+        self.clear(to_bitset(ids))
+        self.alive &= ~to_bitset(ids)
+
+    def clear(self, bitset: int):
+        """Clear pattern bits of all values"""
+        if not bitset:
+            return
+        for val_map in self.fields.values():
+            for val in [val for val, bits in val_map.items() if bits & bitset]:
+                if (bits := val_map[val] & ~bitset):
+                    val_map[val] = bits
+                else:
+                    del val_map[val]
+
+    def query(self, expr: str) -> int:
+        """Evaluate the query, return the bitset of matched patterns"""
+        toks = []
+        pos = 0
+        expr = expr.strip()
+        while pos < len(expr):
+            if not (m := TOKEN_RE.match(expr, pos)):
+                raise SyntaxError(f"invalid query at '{expr[pos:]}'")
+            toks.append(m.group(1) or m.group(2) or m.group(3))
+            pos = m.end()
+
+        toks.append(None)
+        bitset, idx = self.parse_or(toks, 0)
+        if toks[idx] is not None:
+            raise SyntaxError(f"unexpected token '{toks[idx]}' in query")
+        return bitset
+
+    def parse_or(self, toks: list, idx: int) -> tuple:
+        """or_expr := and_expr ('||' and_expr)*"""
+        bitset, idx = self.parse_and(toks, idx)
+        while toks[idx] == '||':
+            rhs, idx = self.parse_and(toks, idx+1)
+            bitset |= rhs
+        return bitset, idx
+
+    def parse_and(self, toks: list, idx: int) -> tuple:
+        """and_expr := not_expr ('&&' not_expr)*"""
+        bitset, idx = self.parse_not(toks, idx)
+        while toks[idx] == '&&':
+            rhs, idx = self.parse_not(toks, idx+1)
+            bitset &= rhs
+        return bitset, idx
+
+    def parse_not(self, toks: list, idx: int) -> tuple:
+        """not_expr := '!' not_expr | '(' or_expr ')' | comparison"""
+        if toks[idx] == '!':
+            bitset, idx = self.parse_not(toks, idx+1)
+            return self.alive & ~bitset, idx
+        if toks[idx] == '(':
+            bitset, idx = self.parse_or(toks, idx+1)
+            if toks[idx] != ')':
+                raise SyntaxError("missing ')' in query")
+            return bitset, idx+1
+        return self.parse_cmp(toks, idx)
+
+    def parse_cmp(self, toks: list, idx: int) -> tuple:
+        """comparison := field op number"""
+        reg_name, op, num = (toks[idx:idx+3] + [None, None])[:3]
+        try:
+            val = int(num, 16) if num.lstrip('-')[:2].lower() == '0x' else int(num)
+        except (AttributeError, ValueError):
+            raise SyntaxError(f"invalid comparison at '{reg_name}' in query")
+        if op not in CMP_OPS:
+            raise SyntaxError(f"invalid comparison at '{reg_name}' in query")
+        if (val_map := self.fields.get(str(reg_name).upper())) is None:
+            raise ValueError(f"unknown field ({reg_name})")
+
+        if num[:2].lower() == '0x':
+            width, is_signed = self.field_format(str(reg_name).upper())
+            try:
+                val = str2int(num, is_signed, width)
+            except ValueError:
+                raise ValueError(f"value overflows the field ({reg_name} {op} {num})")
+
+        if op == '==':
+            return val_map.get(val, 0), idx+3
+        if op == '!=':
+            return self.alive & ~val_map.get(val, 0), idx+3
+
+        bitset = 0
+        for key, bits in val_map.items():
+            if CMP_OPS[op](key, val):
+                bitset |= bits
+        return bitset, idx+3
+
+    def match(self, expr: str) -> list:
+        """Get names of matched patterns"""
+        return [self.names[pat_id] for pat_id in iter_bits(self.query(expr))]
+
+    def save(self, index_fp):
+        """Save the index (pickle)"""
+        with open(index_fp, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(index_fp):
+        """Load the index (pickle)"""
+        with open(index_fp, 'rb') as f:
+            return pickle.load(f)
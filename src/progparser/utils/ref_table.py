@@ -7,7 +7,9 @@
 Reference table for register parsing
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import NamedTuple
 
 import openpyxl
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
@@ -43,6 +45,13 @@ class INIGroup:
     regs:    list = field(default_factory=list)
 
 
+class Field(NamedTuple):
+    reg:       Reg
+    lsb:       int
+    mask:      int      # field mask (not shifted)
+    word_mask: int      # field mask in the word
+
+
 class ReferenceTable:
     """Reference table for register parsing"""
 
@@ -53,6 +62,78 @@ class ReferenceTable:
         self.reg_table = {} 
         self.ini_table = []
         self.hex_out = set()
+        self.build_index()
+
+    def build_index(self):
+        """Build read-only indexes of the table
+
+        reg_index   = {reg_name: reg, ...}
+        field_index = {addr: (field1, field2, ...), ...}  (sorted by lsb)
+        bit_index   = {addr: occupied_bit_mask, ...}
+        wide_addrs  = (addr, ...) of fields out of the 32-bit word
+        """
+        reg_index = {}
+        for ini_grp in self.ini_table:
+            for reg in ini_grp.regs:
+                if reg.name != '<br>' and reg.name != 'RESERVED':
+                    reg_index.setdefault(reg.name, reg)
+
+        field_index = {}
+        bit_index = {}
+        for addr, reg_list in self.reg_table.items():
+            fields = []
+            bits = 0
+            for reg in sorted(reg_list.regs, key=lambda reg: reg.lsb):
+                mask = (1 << (reg.msb - reg.lsb + 1)) - 1
+                fields.append(Field(reg, reg.lsb, mask, mask << reg.lsb))
+                bits |= mask << reg.lsb
+            field_index[addr] = tuple(fields)
+            bit_index[addr] = bits
+
+        self.reg_index = MappingProxyType(reg_index)
+        self.field_index = MappingProxyType(field_index)
+        self.bit_index = MappingProxyType(bit_index)
+        self.wide_addrs = tuple([addr for addr, bits in bit_index.items() if bits >> 32])
+
+    def __getstate__(self) -> dict:
+        # read-only indexes can't be pickled, they are rebuilt on unpickling
+        state = self.__dict__.copy()
+        for name in ('reg_index', 'field_index', 'bit_index'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.build_index()
+
+    def check_layout(self, is_gap: bool=False) -> list:
+        """Check the register layout, return [(kind, addr, message), ...]
+
+        kind: 'overlap' (bits used by multiple fields), 'range' (bit index 
+        out of the 32-bit word), 'name' (duplicated register name), 'gap' 
+        (unused bits in a defined word, only with 'is_gap' as partially 
+        used words are common and not an error).
+        """
+        issues = []
+        names = set()
+        for addr in sorted(self.field_index.keys()):
+            bits = 0
+            for fld in self.field_index[addr]:
+                reg = fld.reg
+                if reg.lsb < 0 or reg.msb > 31 or reg.msb < reg.lsb:
+                    issues.append(('range', addr, 
+                                   f"'{reg.name.lower()}' [{reg.msb}:{reg.lsb}] is out of range"))
+                if bits & fld.word_mask:
+                    issues.append(('overlap', addr, 
+                                   f"'{reg.name.lower()}' overlaps bits {bits & fld.word_mask:#010x}"))
+                bits |= fld.word_mask
+                if reg.name != 'RESERVED':
+                    if reg.name in names:
+                        issues.append(('name', addr, f"'{reg.name.lower()}' is duplicated"))
+                    names.add(reg.name)
+            if is_gap and (gap := ~bits & 0xffffffff) and len(self.field_index[addr]):
+                issues.append(('gap', addr, f"unused bits {gap:#010x}"))
+        return issues
 
     def txt_table_parser(self, table_fp: str):
         """Parse text style register table"""
@@ -197,6 +278,8 @@ class ReferenceTable:
                 line = f.readline()
                 line_no += 1
 
+        self.build_index()
+
         if 't' in self.debug_mode:
             self.show_reg_table("=== REG TABLE PARSER ===")
             self.show_ini_table("=== INI TABLE PARSER ===")
@@ -206,12 +289,17 @@ class ReferenceTable:
         wb = openpyxl.load_workbook(table_fp, data_only=True)
         ws = wb.worksheets[0]
         addr_col = tuple(ws.iter_cols(1, 1, None, None, True))[0]
+        reg_list = None
         for i in range(addr_col.index('ADDR')+1, len(addr_col)):
             row_idx = i + 1
             if addr_col[i] is not None:
                 addr = str(addr_col[i])
                 if addr == 'none':
                     break
+                elif '~' in addr:
+                    # collapsed reserved range, no register defined
+                    reg_list = None
+                    continue
                 else:
                     try:
                         addr = str2int(addr)
@@ -234,6 +322,8 @@ class ReferenceTable:
                         title = str(title).strip()
                     reg_list = RegList(title=title)
                     self.reg_table[addr] = reg_list
+            elif reg_list is None:
+                continue
 
             try:
                 bits = str(ws.cell(row_idx, 4).value).split('_')
@@ -287,6 +377,7 @@ class ReferenceTable:
             ini_grp.regs.append(reg)
 
         wb.close()
+        self.build_index()
 
         if 't' in self.debug_mode:
             self.show_reg_table("=== XLS TABLE PARSER ===")
@@ -415,7 +506,31 @@ class ReferenceTable:
                             else:
                                 f.write("\n")
 
-    def xlsx_export(self, is_init: bool, is_rsv_ext: bool=False):
+    def addr_map(self, rsv_max: int=None):
+        """Iterate the address map in address order
+
+        Yield (addr, end_addr, reg_list). A defined address or a single 
+        reserved word is yielded with end_addr == addr (reg_list is None 
+        if reserved). A reserved gap longer than 'rsv_max' words is 
+        collapsed to one (start_addr, end_addr, None) item.
+        """
+        next_addr = 0
+        for addr in sorted(self.reg_table.keys()):
+            if addr & 0x3:
+                continue
+
+            if (gap := (addr - next_addr) >> 2) > 0:
+                if rsv_max is None or gap <= rsv_max:
+                    for rsv_addr in range(next_addr, addr, 4):
+                        yield rsv_addr, rsv_addr, None
+                else:
+                    yield next_addr, addr - 4, None
+
+            yield addr, addr, self.reg_table[addr]
+            next_addr = addr + 4
+
+    def xlsx_export(self, is_init: bool, is_rsv_ext: bool=False, 
+                    rsv_max: int=None):
         """Export excel style reference table"""
         GREY_FONT = Font(color='ff808080')
         BLUE_FONT = Font(color='ff0000ff')
@@ -523,11 +638,11 @@ class ReferenceTable:
         # Dump register
 
         row_st = row_ed = 8
-        for addr in range(0, max(self.reg_table.keys()) + 4, 4):
+        for addr, end_addr, reg_list in self.addr_map(rsv_max):
             is_first_reg = True
 
-            if addr in self.reg_table:
-                reg_list = self.reg_table[addr]
+            if reg_list is not None:
+                pass
             elif is_rsv_ext:
                 reg_list = RegList(title='reserved', 
                                    regs=[Reg('RESERVED', 'reg', 0, False, 
@@ -541,7 +656,10 @@ class ReferenceTable:
 
                 if is_first_reg:
                     is_first_reg = False
-                    ws.cell(row_ed, 1, hex(addr))
+                    if end_addr == addr:
+                        ws.cell(row_ed, 1, hex(addr))
+                    else:
+                        ws.cell(row_ed, 1, f"{hex(addr)}~{hex(end_addr)}")
                     ws.cell(row_ed, 2, reg_list.title)
 
                 cell = ws.cell(row_ed, 1)
@@ -627,6 +745,37 @@ class ReferenceTable:
         wb.save('table_dump.xlsx')
         wb.close()
 
+    def init_diff(self, other) -> set:
+        """Compare with another table and get registers with new init values
+
+        Return a set of register names if only initial values are changed, 
+        or None if the layout of the table is changed.
+        """
+        if self.hex_out != other.hex_out:
+            return None
+
+        if ([(addr, reg_list.title) for addr, reg_list in self.reg_table.items()]
+            != [(addr, reg_list.title) for addr, reg_list in other.reg_table.items()]):
+            return None
+
+        if ([(ini_grp.tag, len(ini_grp.regs)) for ini_grp in self.ini_table]
+            != [(ini_grp.tag, len(ini_grp.regs)) for ini_grp in other.ini_table]):
+            return None
+
+        reg_names = set()
+        for l_grp, r_grp in zip(self.ini_table, other.ini_table):
+            for l_reg, r_reg in zip(l_grp.regs, r_grp.regs):
+                if l_reg == r_reg:
+                    continue
+                if l_reg.name != r_reg.name:
+                    return None
+                if any([getattr(l_reg, fld.name) != getattr(r_reg, fld.name)
+                        for fld in fields(Reg) if fld.name != 'init_val']):
+                    return None
+                reg_names.add(l_reg.name)
+
+        return reg_names
+
     def sign_check(self, str_: str) -> bool:
         """Syntax check for sign type flag"""
         str_ = str_.lower()
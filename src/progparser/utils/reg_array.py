@@ -0,0 +1,322 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Columnar (struct-of-arrays) register table
+"""
+
+import pickle
+import struct
+from array import array
+from dataclasses import fields
+
+from progparser.utils.ref_table import INIGroup, Reg, RegList
+
+TYPE_CODES = ('reg', 'str', 'float', 'int', '<br>')
+
+FLAG_SIGNED = 0x1
+FLAG_ACCESS = 0x2
+FLAG_WIDE   = 0x4       # init value of the address register is in obj_vals
+
+INIT_MIN = -(1 << 63)
+INIT_MAX = (1 << 63) - 1
+
+COLUMNS = ('type_col', 'addr_col', 'msb_col', 'lsb_col', 'flag_col', 'init_col',
+           'row_col', 'name_col', 'comment_col', 'extra_col')
+
+BUF_MAGIC = b'RGA2'
+BUF_HEADER = struct.Struct('<4sIQ')     # magic, record number, tail offset
+
+
+class RegArray:
+    """Compact register table with one array per register attribute
+
+    Records are stored in the ini table order. Strings are interned in
+    'strs' and referenced by index (-1 for None). Initial values of
+    non-address registers (str/float/int), and of address registers out
+    of the signed 64-bit range, are kept in 'obj_vals'.
+    """
+
+    def __init__(self):
+        self.type_col = array('b')
+        self.addr_col = array('q')
+        self.msb_col = array('h')
+        self.lsb_col = array('h')
+        self.flag_col = array('B')
+        self.init_col = array('q')
+        self.row_col = array('l')
+        self.name_col = array('l')
+        self.comment_col = array('l')
+        self.extra_col = array('l')
+        self.obj_vals = {}          # {rec_idx: init_val, ...}
+        self.strs = []              # interned strings
+        self.groups = []            # [(tag_idx, max_len, rec_st, rec_ed), ...]
+        self.titles = []            # [(addr, title_idx), ...] in reg_table order
+        self.hex_out = []           # [name_idx, ...]
+
+    def __len__(self) -> int:
+        return len(self.type_col)
+
+    def intern(self, str_: str, str_ids: dict) -> int:
+        """Get the index of an interned string"""
+        if str_ is None:
+            return -1
+        if (idx := str_ids.get(str_)) is None:
+            idx = str_ids[str_] = len(self.strs)
+            self.strs.append(str_)
+        return idx
+
+    def get_str(self, idx: int) -> str:
+        """Get an interned string by index"""
+        return None if idx < 0 else self.strs[idx]
+
+    @classmethod
+    def from_table(cls, table):
+        """Build the compact form of a reference table"""
+        reg_array = cls()
+        str_ids = {}
+
+        for ini_grp in table.ini_table:
+            rec_st = len(reg_array)
+            for reg in ini_grp.regs:
+                reg_array.append(reg, str_ids)
+            reg_array.groups.append((reg_array.intern(ini_grp.tag, str_ids),
+                                     ini_grp.max_len, rec_st, len(reg_array)))
+
+        for addr, reg_list in table.reg_table.items():
+            reg_array.titles.append((addr, reg_array.intern(reg_list.title, str_ids)))
+
+        reg_array.hex_out = [reg_array.intern(name, str_ids)
+                             for name in sorted(table.hex_out)]
+        return reg_array
+
+    def append(self, reg: Reg, str_ids: dict):
+        """Append one register record"""
+        rec_idx = len(self)
+        type_id = 4 if reg.name == '<br>' else TYPE_CODES.index(reg.type)
+        is_reg = type_id == 0
+        is_wide = is_reg and not (isinstance(reg.init_val, int)
+                                  and INIT_MIN <= reg.init_val <= INIT_MAX)
+        try:
+            rec = (array(self.addr_col.typecode, [reg.addr if is_reg else -1]),
+                   array(self.msb_col.typecode, [reg.msb if is_reg else -1]),
+                   array(self.lsb_col.typecode, [reg.lsb if is_reg else -1]),
+                   array(self.row_col.typecode, [-1 if reg.row_idx is None else reg.row_idx]))
+        except (OverflowError, TypeError):
+            print('-' * 60)
+            print("TableParseError:")
+            print("register: {}".format(reg.name))
+            print("address/bit range out of the register array ({}, [{}:{}])".format(
+                  reg.addr, reg.msb, reg.lsb))
+            print('-' * 60)
+            raise ValueError("TableParseError")
+
+        self.type_col.append(type_id)
+        self.addr_col.extend(rec[0])
+        self.msb_col.extend(rec[1])
+        self.lsb_col.extend(rec[2])
+        self.flag_col.append((FLAG_SIGNED if reg.is_signed else 0)
+                             | (FLAG_ACCESS if reg.is_access else 0)
+                             | (FLAG_WIDE if is_wide else 0))
+        self.row_col.extend(rec[3])
+        self.name_col.append(self.intern(reg.name, str_ids))
+        self.comment_col.append(self.intern(reg.comment, str_ids))
+        self.extra_col.append(self.intern(reg.extra, str_ids))
+
+        if is_reg and not is_wide:
+            self.init_col.append(reg.init_val)
+        else:
+            self.init_col.append(0)
+            if reg.init_val is not None:
+                self.obj_vals[rec_idx] = reg.init_val
+
+    def reg(self, rec_idx: int) -> Reg:
+        """Create the register view of one record"""
+        type_id = self.type_col[rec_idx]
+        name = self.strs[self.name_col[rec_idx]]
+
+        if type_id == 4:
+            return Reg(name, None, None, None)
+
+        flags = self.flag_col[rec_idx]
+        row_idx = self.row_col[rec_idx]
+        reg = Reg(name, TYPE_CODES[type_id], None, bool(flags & FLAG_ACCESS),
+                  comment=self.get_str(self.comment_col[rec_idx]),
+                  row_idx=None if row_idx < 0 else row_idx,
+                  extra=self.get_str(self.extra_col[rec_idx]))
+
+        if type_id == 0:
+            reg.init_val = (self.obj_vals[rec_idx] if flags & FLAG_WIDE
+                            else self.init_col[rec_idx])
+            reg.addr = self.addr_col[rec_idx]
+            reg.msb = self.msb_col[rec_idx]
+            reg.lsb = self.lsb_col[rec_idx]
+            reg.is_signed = bool(flags & FLAG_SIGNED)
+        else:
+            reg.init_val = self.obj_vals.get(rec_idx)
+
+        return reg
+
+    def __getitem__(self, rec_idx: int) -> Reg:
+        return self.reg(rec_idx)
+
+    def view(self, rec_idx: int):
+        """Create the read-only register view of one record"""
+        return RegView(self, rec_idx)
+
+    def to_buffer(self) -> bytes:
+        """Serialize to the flat buffer layout
+
+        header | columns (8-byte aligned) | pickled strings and objects
+        """
+        cols = b''
+        for col_name in COLUMNS:
+            data = getattr(self, col_name).tobytes()
+            cols += data + b'\0' * (-len(data) % 8)
+
+        tail = pickle.dumps((self.obj_vals, self.strs, self.groups, self.titles,
+                             self.hex_out), pickle.HIGHEST_PROTOCOL)
+        return BUF_HEADER.pack(BUF_MAGIC, len(self), BUF_HEADER.size + len(cols)) + cols + tail
+
+    @classmethod
+    def from_buffer(cls, buf):
+        """Attach to a flat buffer (columns are read-only views, not copied)"""
+        mv = memoryview(buf).toreadonly()
+        magic, rec_num, tail_off = BUF_HEADER.unpack_from(mv)
+        if magic != BUF_MAGIC:
+            raise ValueError("not a register array buffer")
+
+        reg_array = cls()
+        offset = BUF_HEADER.size
+        for col_name in COLUMNS:
+            typecode = getattr(reg_array, col_name).typecode
+            size = rec_num * getattr(reg_array, col_name).itemsize
+            setattr(reg_array, col_name, mv[offset:offset+size].cast(typecode))
+            offset += size + (-size % 8)
+
+        (reg_array.obj_vals, reg_array.strs, reg_array.groups, reg_array.titles,
+         reg_array.hex_out) = pickle.loads(mv[tail_off:])
+        return reg_array
+
+    def to_table(self, table, is_lazy: bool=False):
+        """Rebuild reg_table/ini_table of a reference table
+
+        With 'is_lazy', registers are RegView objects reading the columns 
+        on access instead of Reg copies of the records.
+        """
+        make_reg = self.view if is_lazy else self.reg
+        regs = [make_reg(i) for i in range(len(self))]
+
+        table.ini_table = []
+        for tag_idx, max_len, rec_st, rec_ed in self.groups:
+            table.ini_table.append(INIGroup(self.get_str(tag_idx), max_len,
+                                            regs[rec_st:rec_ed]))
+
+        table.reg_table = {}
+        for addr, title_idx in self.titles:
+            table.reg_table[addr] = RegList(title=self.get_str(title_idx))
+        for reg in regs:
+            if reg.type == 'reg':
+                table.reg_table[reg.addr].regs.append(reg)
+
+        table.hex_out = {self.strs[name_idx] for name_idx in self.hex_out}
+        table.build_index()
+
+
+class RegView:
+    """Read-only Reg view of one RegArray record
+
+    Attributes are read from the columns on access, a view keeps only the
+    array, the record index and the type. Views compare equal to Reg of
+    the same record and are pickled as Reg.
+    """
+
+    __slots__ = ('reg_array', 'rec_idx', 'type_id')
+
+    def __init__(self, reg_array: RegArray, rec_idx: int):
+        self.reg_array = reg_array
+        self.rec_idx = rec_idx
+        self.type_id = reg_array.type_col[rec_idx]
+
+    @property
+    def name(self) -> str:
+        return self.reg_array.strs[self.reg_array.name_col[self.rec_idx]]
+
+    @property
+    def type(self) -> str:
+        return None if self.type_id == 4 else TYPE_CODES[self.type_id]
+
+    @property
+    def init_val(self):
+        if self.type_id == 0 and not self.reg_array.flag_col[self.rec_idx] & FLAG_WIDE:
+            return self.reg_array.init_col[self.rec_idx]
+        return self.reg_array.obj_vals.get(self.rec_idx)
+
+    @property
+    def is_access(self) -> bool:
+        if self.type_id == 4:
+            return None
+        return bool(self.reg_array.flag_col[self.rec_idx] & FLAG_ACCESS)
+
+    @property
+    def addr(self) -> int:
+        return self.reg_col(self.reg_array.addr_col)
+
+    @property
+    def msb(self) -> int:
+        return self.reg_col(self.reg_array.msb_col)
+
+    @property
+    def lsb(self) -> int:
+        return self.reg_col(self.reg_array.lsb_col)
+
+    @property
+    def is_signed(self) -> bool:
+        if self.type_id != 0:
+            return None
+        return bool(self.reg_array.flag_col[self.rec_idx] & FLAG_SIGNED)
+
+    @property
+    def comment(self) -> str:
+        return self.str_col(self.reg_array.comment_col)
+
+    @property
+    def row_idx(self) -> int:
+        if self.type_id == 4:
+            return None
+        row_idx = self.reg_array.row_col[self.rec_idx]
+        return None if row_idx < 0 else row_idx
+
+    @property
+    def extra(self) -> str:
+        return self.str_col(self.reg_array.extra_col)
+
+    def reg_col(self, col):
+        """Read a column of address registers (None for others)"""
+        return col[self.rec_idx] if self.type_id == 0 else None
+
+    def str_col(self, col):
+        """Read a string column (None for '<br>')"""
+        if self.type_id == 4:
+            return None
+        return self.reg_array.get_str(col[self.rec_idx])
+
+    def to_reg(self) -> Reg:
+        """Create the Reg copy of the record"""
+        return self.reg_array.reg(self.rec_idx)
+
+    def __eq__(self, other):
+        if isinstance(other, RegView):
+            other = other.to_reg()
+        return self.to_reg() == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        reg = self.to_reg()
+        return Reg, tuple([getattr(reg, fld.name) for fld in fields(Reg)])
+
+    def __repr__(self) -> str:
+        return repr(self.to_reg())
@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Reference table published for worker processes
+
+The table is compiled to the RegArray buffer layout once and published
+in shared memory (or a memory-mapped file). Workers receive the small
+handle only and attach read-only without copying the columns:
+
+    with SharedTable(table) as shared:
+        with ProcessPoolExecutor(initializer=init_worker,
+                                 initargs=(shared.handle,)) as executor:
+            ...
+
+    def init_worker(handle):
+        table = PatternList(handle, 'shared')
+"""
+
+import mmap
+from multiprocessing import shared_memory
+
+from progparser.utils.reg_array import RegArray
+
+
+class SharedTable:
+    """Publish a compiled reference table (owner side)"""
+
+    def __init__(self, table, mmap_fp=None):
+        # handle = ('shm', name) or ('mmap', path)
+        buf = RegArray.from_table(table).to_buffer()
+
+        if mmap_fp is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=len(buf))
+            self.shm.buf[:len(buf)] = buf
+            self.handle = ('shm', self.shm.name)
+        else:
+            self.shm = None
+            with open(mmap_fp, 'wb') as f:
+                f.write(buf)
+            self.handle = ('mmap', str(mmap_fp))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Withdraw the published table"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def attach_table(handle: tuple) -> RegArray:
+    """Attach to a published table read-only (worker side)
+
+    The returned array owns the attachment, the buffer is released with
+    the array (and the RegView registers reading it).
+    """
+    kind, name = handle
+    if kind == 'shm':
+        # workers share the resource tracker of the owner (registered once),
+        # the segment is unlinked by the owner
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        owner, buf = shm, shm.buf
+    else:
+        with open(name, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        owner = buf
+
+    reg_array = RegArray.from_buffer(buf)
+    reg_array.owner = owner
+    return reg_array
@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Writer sinks for rendered patterns
+"""
+
+import os
+import shutil
+import threading
+import zipfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def to_bytes(data) -> bytes:
+    """Convert rendered data (str/bytes/array) to bytes"""
+    if isinstance(data, str):
+        return data.encode()
+    elif isinstance(data, array):
+        return data.tobytes()
+    else:
+        return bytes(data)
+
+
+def write_file(path, data, is_fsync: bool=False):
+    """Write one file (str in text mode, others in binary mode)"""
+    with open(path, 'w' if isinstance(data, str) else 'wb') as f:
+        f.write(data if isinstance(data, str) else to_bytes(data))
+        if is_fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def copy_file(src_fp, dst_fp, is_fsync: bool=False):
+    """Copy one file"""
+    shutil.copy(src_fp, dst_fp)
+    if is_fsync:
+        with open(dst_fp, 'rb') as f:
+            os.fsync(f.fileno())
+
+
+class MemorySink:
+    """Keep rendered outputs in memory"""
+
+    def __init__(self):
+        # outputs = {name: data, ...}
+        self.outputs = {}
+
+    def write(self, name: str, data):
+        """Write one output"""
+        self.outputs[name] = data
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirSink(MemorySink):
+    """Write rendered outputs to a directory"""
+
+    def __init__(self, out_dir, is_fsync: bool=False):
+        super().__init__()
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.is_fsync = is_fsync
+
+    def write(self, name: str, data):
+        """Write one output"""
+        write_file(self.out_dir / name, data, self.is_fsync)
+        self.outputs[name] = None
+
+    def copy(self, src_fp, name: str):
+        """Copy one file as an output"""
+        copy_file(src_fp, self.out_dir / name, self.is_fsync)
+        self.outputs[name] = None
+
+
+class AsyncDirSink(DirSink):
+    """Write rendered outputs to a directory by a thread pool
+
+    Outputs are rendered by the caller and written by 'jobs' threads. At 
+    most 'max_pending' outputs are queued, a write blocks until one is 
+    done. The first failure is raised by the next write or close, so 
+    every written output is complete after close.
+    """
+
+    def __init__(self, out_dir, jobs: int=4, max_pending: int=None, 
+                 is_fsync: bool=False):
+        super().__init__(out_dir, is_fsync)
+        self.max_pending = max_pending if max_pending else jobs * 4
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.error = None
+
+    def write(self, name: str, data):
+        """Queue one output"""
+        self.submit(write_file, self.out_dir / name, data, self.is_fsync)
+        self.outputs[name] = None
+
+    def copy(self, src_fp, name: str):
+        """Queue one file copy as an output"""
+        self.submit(copy_file, src_fp, self.out_dir / name, self.is_fsync)
+        self.outputs[name] = None
+
+    def submit(self, func, *args):
+        """Submit one job (blocked while the queue is full)"""
+        if self.error is not None:
+            raise self.error
+        self.slots.acquire()
+        self.executor.submit(func, *args).add_done_callback(self.done)
+
+    def done(self, future):
+        """Release the slot of a finished job and keep the first error"""
+        if future.exception() is not None and self.error is None:
+            self.error = future.exception()
+        self.slots.release()
+
+    def wait(self):
+        """Wait until all queued jobs are done"""
+        for _ in range(self.max_pending):
+            self.slots.acquire()
+        for _ in range(self.max_pending):
+            self.slots.release()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
+
+
+class ZipSink(MemorySink):
+    """Write rendered outputs to a zip archive"""
+
+    def __init__(self, zip_fp, compression=zipfile.ZIP_DEFLATED):
+        super().__init__()
+        self.zip_file = zipfile.ZipFile(zip_fp, 'w', compression)
+
+    def write(self, name: str, data):
+        """Write one output"""
+        self.zip_file.writestr(name, to_bytes(data))
+        self.outputs[name] = None
+
+    def close(self):
+        self.zip_file.close()
@@ -0,0 +1,194 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+SQLite database of the reference table and patterns
+
+    reg_group (grp_id, tag, max_len)
+    reg_field (rec_id, grp_id, name, type, addr, msb, lsb, is_signed,
+               is_access, init_val, comment, row_idx, extra)
+    reg_title (seq, addr, title)
+    hex_out   (name)
+    pattern   (pat_id, name)
+    pat_value (pat_id, reg_name, value)
+
+Register names are upper case as the parsed table, pattern values are
+stored as the value string of the pattern.
+"""
+
+import sqlite3
+from pathlib import Path
+
+from progparser.utils.ref_table import INIGroup, Reg, RegList
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reg_group (
+    grp_id    INTEGER PRIMARY KEY,
+    tag       TEXT,
+    max_len   INTEGER
+);
+CREATE TABLE IF NOT EXISTS reg_field (
+    rec_id    INTEGER PRIMARY KEY,
+    grp_id    INTEGER NOT NULL REFERENCES reg_group(grp_id),
+    name      TEXT NOT NULL,
+    type      TEXT,
+    addr      INTEGER,
+    msb       INTEGER,
+    lsb       INTEGER,
+    is_signed INTEGER,
+    is_access INTEGER,
+    init_val  TEXT,
+    comment   TEXT,
+    row_idx   INTEGER,
+    extra     TEXT
+);
+CREATE INDEX IF NOT EXISTS reg_field_name ON reg_field(name);
+CREATE INDEX IF NOT EXISTS reg_field_addr ON reg_field(addr);
+CREATE TABLE IF NOT EXISTS reg_title (
+    seq       INTEGER PRIMARY KEY,
+    addr      INTEGER NOT NULL UNIQUE,
+    title     TEXT
+);
+CREATE TABLE IF NOT EXISTS hex_out (
+    name      TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS pattern (
+    pat_id    INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS pat_value (
+    pat_id    INTEGER NOT NULL REFERENCES pattern(pat_id) ON DELETE CASCADE,
+    reg_name  TEXT NOT NULL,
+    value     TEXT,
+    PRIMARY KEY (pat_id, reg_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pat_value_reg ON pat_value(reg_name, value);
+"""
+
+INIT_TYPES = {'reg': int, 'int': int, 'float': float, 'str': str}
+
+
+class RegDB:
+    """SQLite database of the reference table and patterns"""
+
+    def __init__(self, db_fp, is_readonly: bool=False):
+        # is_readonly: open an existed database only (never create one)
+        if is_readonly:
+            self.conn = sqlite3.connect(f"{Path(db_fp).resolve().as_uri()}?mode=ro", 
+                                        uri=True)
+            self.conn.execute("PRAGMA foreign_keys = ON")
+        else:
+            self.conn = sqlite3.connect(db_fp)
+            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def save_table(self, table):
+        """Save (replace) the reference table"""
+        grp_rows = []
+        reg_rows = []
+        rec_id = 0
+        for grp_id, ini_grp in enumerate(table.ini_table):
+            grp_rows.append((grp_id, ini_grp.tag, ini_grp.max_len))
+            for reg in ini_grp.regs:
+                reg_rows.append((rec_id, grp_id, reg.name, reg.type, reg.addr, reg.msb,
+                                 reg.lsb, reg.is_signed, reg.is_access,
+                                 None if reg.init_val is None else str(reg.init_val),
+                                 reg.comment, reg.row_idx, reg.extra))
+                rec_id += 1
+
+        with self.conn:
+            self.conn.execute("DELETE FROM reg_field")
+            self.conn.execute("DELETE FROM reg_group")
+            self.conn.execute("DELETE FROM reg_title")
+            self.conn.execute("DELETE FROM hex_out")
+            self.conn.executemany("INSERT INTO reg_group VALUES (?, ?, ?)", grp_rows)
+            self.conn.executemany("INSERT INTO reg_field VALUES "
+                                  "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", reg_rows)
+            self.conn.executemany("INSERT INTO reg_title (addr, title) VALUES (?, ?)",
+                                  [(addr, reg_list.title)
+                                   for addr, reg_list in table.reg_table.items()])
+            self.conn.executemany("INSERT INTO hex_out VALUES (?)",
+                                  [(name,) for name in sorted(table.hex_out)])
+
+    def load_table(self, table):
+        """Load reg_table/ini_table/hex_out of a reference table"""
+        table.ini_table = []
+        groups = {}
+        for grp_id, tag, max_len in self.conn.execute(
+                "SELECT grp_id, tag, max_len FROM reg_group ORDER BY grp_id"):
+            groups[grp_id] = INIGroup(tag, max_len)
+            table.ini_table.append(groups[grp_id])
+
+        table.reg_table = {}
+        for addr, title in self.conn.execute("SELECT addr, title FROM reg_title ORDER BY seq"):
+            table.reg_table[addr] = RegList(title=title)
+
+        for (grp_id, name, type_, addr, msb, lsb, is_signed, is_access, init_val,
+             comment, row_idx, extra) in self.conn.execute(
+                "SELECT grp_id, name, type, addr, msb, lsb, is_signed, is_access, "
+                "init_val, comment, row_idx, extra FROM reg_field ORDER BY rec_id"):
+            if name == '<br>':
+                reg = Reg(name, None, None, None)
+            else:
+                if init_val is not None:
+                    init_val = INIT_TYPES[type_](init_val)
+                reg = Reg(name, type_, init_val, bool(is_access), addr=addr,
+                          msb=msb, lsb=lsb,
+                          is_signed=None if is_signed is None else bool(is_signed),
+                          comment=comment, row_idx=row_idx, extra=extra)
+                if type_ == 'reg':
+                    table.reg_table[addr].regs.append(reg)
+            groups[grp_id].regs.append(reg)
+
+        table.hex_out = {name for name, in self.conn.execute("SELECT name FROM hex_out")}
+        table.build_index()
+
+    def save_patterns(self, pats: list):
+        """Save patterns [(pat_name, regs), ...], existed ones are replaced"""
+        with self.conn:
+            self.conn.executemany("DELETE FROM pattern WHERE name = ?",
+                                  [(pat.name,) for pat in pats])
+            self.conn.executemany("INSERT INTO pattern (name) VALUES (?)",
+                                  [(pat.name,) for pat in pats])
+            pat_ids = dict(self.conn.execute("SELECT name, pat_id FROM pattern"))
+            self.conn.executemany("INSERT INTO pat_value VALUES (?, ?, ?)",
+                                  [(pat_ids[pat.name], reg_name, value)
+                                   for pat in pats for reg_name, value in pat.regs.items()])
+
+    def load_patterns(self, sql: str=None, params=()) -> list:
+        """Load patterns [(pat_name, regs), ...] in the saved order
+
+        'sql' selects pattern names (first column), all patterns are
+        loaded if not given.
+        """
+        if sql is None:
+            cur = self.conn.execute(
+                    "SELECT p.name, v.reg_name, v.value FROM pattern p "
+                    "LEFT JOIN pat_value v USING (pat_id) ORDER BY p.pat_id")
+        else:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS pat_sel (name TEXT)")
+            self.conn.execute("DELETE FROM pat_sel")
+            self.conn.executemany("INSERT INTO pat_sel VALUES (?)",
+                                  [(row[0],) for row in self.conn.execute(sql, params)])
+            cur = self.conn.execute(
+                    "SELECT p.name, v.reg_name, v.value FROM pattern p "
+                    "LEFT JOIN pat_value v USING (pat_id) "
+                    "WHERE p.name IN (SELECT name FROM pat_sel) ORDER BY p.pat_id")
+
+        pats = {}
+        for pat_name, reg_name, value in cur:
+            regs = pats.setdefault(pat_name, {})
+            if reg_name is not None:
+                regs[reg_name] = value
+        return list(pats.items())
@@ -0,0 +1,351 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Declarative register sweep for batch pattern generation
+
+    SWEEP = (Sweep.product('plan1', reg_a=range(0, 4), reg_b=[0.1, 0.2])
+             .where(lambda regs: regs['reg_a'] != 2)
+             .fix(reg_c=1))
+
+Patterns are generated lazily as (pat_name, mod_regs) in the order of
+the domains, named '<name>-<index>'.
+
+    SWEEP = Sweep.nwise('plan2', strength=2, reg_a=range(4), reg_b=[0, 1], ...)
+
+N-wise sweeps generate a covering array (IPOG) in which every value
+combination of any 'strength' registers appears at least once.
+
+    SWEEP = (RandomSweep('plan3', count=1000, seed=1)
+             .between('reg_a', 2, 9)
+             .choice('reg_b', [0, 1, 3], weights=[8, 1, 1])
+             .where(lambda regs: regs['reg_a'] < regs['reg_c']))
+
+Random sweeps draw the accessible fields of the reference table by the
+field width and signedness, reproducible by the seed.
+"""
+
+import itertools
+import math
+import random
+
+
+class Sweep:
+    """Lazily evaluated register sweep"""
+
+    def __init__(self, name: str, domains: dict, mode: str='product',
+                 strength: int=None):
+        # domains = {reg_name: values, ...}
+        # mode: product/zip/chain/nwise
+        if mode not in ('product', 'zip', 'chain', 'nwise'):
+            raise ValueError(f"unsupported sweep mode ({mode})")
+        if mode == 'nwise' and (strength is None or strength < 1):
+            raise ValueError(f"invalid sweep strength ({strength})")
+        self.name = name
+        self.mode = mode
+        self.strength = strength
+        self.rows = None
+        self.domains = {reg_name: self.domain(values)
+                        for reg_name, values in domains.items()}
+        self.subs = []
+        self.filters = []
+        self.fixed = {}
+
+    @staticmethod
+    def domain(values):
+        """Keep a re-iterable sized domain (range/list/tuple)"""
+        if isinstance(values, (range, list, tuple)):
+            return values
+        elif isinstance(values, (str, bytes)) or not hasattr(values, '__iter__'):
+            return (values,)
+        return tuple(values)
+
+    @classmethod
+    def product(cls, name: str, **domains):
+        """Cartesian product of register domains"""
+        return cls(name, domains, 'product')
+
+    @classmethod
+    def zip(cls, name: str, **domains):
+        """Zip register domains (stop at the shortest domain)"""
+        return cls(name, domains, 'zip')
+
+    @classmethod
+    def nwise(cls, name: str, strength: int=2, **domains):
+        """Covering array of register domains with the interaction strength"""
+        return cls(name, domains, 'nwise', strength)
+
+    @classmethod
+    def pairwise(cls, name: str, **domains):
+        """Covering array of register domains (strength 2)"""
+        return cls(name, domains, 'nwise', 2)
+
+    @classmethod
+    def chain(cls, name: str, *sweeps):
+        """Concatenate sweeps, patterns are re-named by this sweep"""
+        sweep = cls(name, {}, 'chain')
+        sweep.subs = list(sweeps)
+        return sweep
+
+    def where(self, func):
+        """Keep patterns if func(mod_regs) is true"""
+        self.filters.append(func)
+        return self
+
+    def fix(self, **regs):
+        """Set fixed registers for all patterns"""
+        self.fixed.update(regs)
+        return self
+
+    def bind(self, table):
+        """Bind the reference table (used by random sub-sweeps)"""
+        for sub in self.subs:
+            sub.bind(table)
+        return self
+
+    def iter_regs(self):
+        """Iterate mod_regs of all combinations kept by filters"""
+        if self.mode == 'chain':
+            combos = itertools.chain.from_iterable(sub.iter_regs() for sub in self.subs)
+        else:
+            names = tuple(self.domains.keys())
+            if self.mode == 'product':
+                combos = itertools.product(*self.domains.values())
+            elif self.mode == 'nwise':
+                values = tuple(self.domains.values())
+                combos = (tuple(values[i][v] for i, v in enumerate(row))
+                          for row in self.covering_rows())
+            else:
+                combos = zip(*self.domains.values())
+            combos = (dict(zip(names, combo)) for combo in combos)
+
+        for mod_regs in combos:
+            mod_regs.update(self.fixed)
+            if all(func(mod_regs) for func in self.filters):
+                yield mod_regs
+
+    def __iter__(self):
+        """Iterate (pat_name, mod_regs)"""
+        for idx, mod_regs in enumerate(self.iter_regs()):
+            yield f"{self.name}-{idx}", mod_regs
+
+    def is_filtered(self) -> bool:
+        """Check if any filter exists in the sweep"""
+        return bool(self.filters) or any(sub.is_filtered() for sub in self.subs)
+
+    def estimate(self) -> int:
+        """Upper bound of the pattern count (filters are not applied)"""
+        if self.mode == 'chain':
+            return sum(sub.estimate() for sub in self.subs)
+        sizes = [len(values) for values in self.domains.values()]
+        if not sizes:
+            return 0
+        if self.mode == 'nwise':
+            return len(self.covering_rows())
+        return math.prod(sizes) if self.mode == 'product' else min(sizes)
+
+    def count(self) -> int:
+        """Exact pattern count (iterate lazily if filters exist)"""
+        if not self.is_filtered():
+            return self.estimate()
+        return sum(1 for _ in self)
+
+    def covering_rows(self) -> list:
+        """Build (once) the covering array as rows of value indexes"""
+        if self.rows is None:
+            sizes = [len(values) for values in self.domains.values()]
+            self.rows = covering_array(sizes, self.strength)
+        return self.rows
+
+
+class RandomSweep:
+    """Seeded constrained-random register sweep"""
+
+    MAX_ROUND = 100
+
+    def __init__(self, name: str, count: int, seed: int=0, regs: list=None):
+        # regs: registers to draw from the table (default: all accessible)
+        # fields = {reg_name: (min_val, width), ...}  (set by bind)
+        # rules  = {reg_name: (kind, args), ...}      (kind: between/choice)
+        self.name = name
+        self.mode = 'random'
+        self.strength = None
+        self.seed = seed
+        self.pat_num = count
+        self.regs = None if regs is None else {reg_name.lower() for reg_name in regs}
+        self.fields = {}
+        self.rules = {}
+        self.filters = []
+        self.fixed = {}
+
+    def bind(self, table):
+        """Get drawn fields from the reference table"""
+        self.fields = {}
+        for reg in table.reg_index.values():
+            reg_name = reg.name.lower()
+            if (reg.type != 'reg' or not reg.is_access
+                    or (self.regs is not None and reg_name not in self.regs)):
+                continue
+            width = reg.msb - reg.lsb + 1
+            min_val = -(1 << (width - 1)) if reg.is_signed else 0
+            self.fields[reg_name] = (min_val, width)
+        return self
+
+    def between(self, reg_name: str, min_val: int, max_val: int):
+        """Draw the register in [min_val, max_val]"""
+        self.rules[reg_name.lower()] = ('between', (min_val, max_val))
+        return self
+
+    def choice(self, reg_name: str, values: list, weights: list=None):
+        """Draw the register from values (optionally weighted)"""
+        self.rules[reg_name.lower()] = ('choice', (list(values), weights))
+        return self
+
+    def where(self, func):
+        """Keep patterns if func(mod_regs) is true (rejection sampling)"""
+        self.filters.append(func)
+        return self
+
+    def fix(self, **regs):
+        """Set fixed registers for all patterns"""
+        self.fixed.update({reg_name.lower(): value for reg_name, value in regs.items()})
+        return self
+
+    def draw(self, rng: random.Random, reg_name: str, num: int) -> list:
+        """Draw a column of values of one register"""
+        if (rule := self.rules.get(reg_name)) is None:
+            min_val, width = self.fields[reg_name]
+            getrandbits = rng.getrandbits
+            return [getrandbits(width) + min_val for _ in range(num)]
+
+        kind, args = rule
+        if kind == 'between':
+            randint = rng.randint
+            return [randint(*args) for _ in range(num)]
+        return rng.choices(args[0], args[1], k=num)
+
+    def iter_regs(self):
+        """Iterate mod_regs of random patterns kept by filters"""
+        rng = random.Random(self.seed)
+        names = [reg_name for reg_name in itertools.chain(self.fields, self.rules)
+                 if reg_name not in self.fixed]
+        names = list(dict.fromkeys(names))
+
+        remain = self.pat_num
+        for _ in range(self.MAX_ROUND):
+            if remain <= 0:
+                return
+            cols = [self.draw(rng, reg_name, remain) for reg_name in names]
+            for vals in (zip(*cols) if cols else itertools.repeat((), remain)):
+                mod_regs = dict(zip(names, vals))
+                mod_regs.update(self.fixed)
+                if all(func(mod_regs) for func in self.filters):
+                    yield mod_regs
+                    if (remain := remain - 1) == 0:
+                        return
+
+        raise ValueError(f"constraints of sweep '{self.name}' are unsatisfiable "
+                         f"({self.pat_num - remain}/{self.pat_num} patterns drawn)")
+
+    def __iter__(self):
+        """Iterate (pat_name, mod_regs)"""
+        for idx, mod_regs in enumerate(self.iter_regs()):
+            yield f"{self.name}-{idx}", mod_regs
+
+    def is_filtered(self) -> bool:
+        """Random sweeps always draw the exact count"""
+        return False
+
+    def estimate(self) -> int:
+        """Pattern count"""
+        return self.pat_num
+
+    def count(self) -> int:
+        """Pattern count"""
+        return self.pat_num
+
+
+def covering_array(sizes: list, strength: int) -> list:
+    """Covering array of the strength by IPOG (rows of value indexes)
+
+    Parameters are extended one by one in descending order of domain size:
+    each new parameter is first assigned to the existing rows greedily by
+    the number of newly covered tuples (horizontal growth), then the rest
+    tuples are covered by adding rows with don't-care cells (vertical
+    growth).
+    """
+    if not sizes or 0 in sizes:
+        return []
+
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    dims = [sizes[i] for i in order]
+    t = min(strength, len(dims))
+
+    rows = [list(row) for row in itertools.product(*[range(size) for size in dims[:t]])]
+
+    for i in range(t, len(dims)):
+        ## uncovered = {param_combo: {value_key: {new_value, ...}}, ...}
+
+        uncovered = {}
+        for combo in itertools.combinations(range(i), t-1):
+            uncovered[combo] = {key: set(range(dims[i])) for key in
+                                itertools.product(*[range(dims[p]) for p in combo])}
+
+        ## horizontal growth
+
+        for r_idx, row in enumerate(rows):
+            gains = [0] * dims[i]
+            keys = []
+            for combo, key_map in uncovered.items():
+                key = tuple(row[p] for p in combo)
+                keys.append((key_map, key))
+                if (vals := key_map.get(key)):
+                    for v in vals:
+                        gains[v] += 1
+
+            ## rotate the first candidate to spread values of ties
+            best = max([(r_idx + v) % dims[i] for v in range(dims[i])],
+                       key=gains.__getitem__)
+            row.append(best)
+            for key_map, key in keys:
+                if (vals := key_map.get(key)) and best in vals:
+                    vals.discard(best)
+                    if not vals:
+                        del key_map[key]
+
+        ## vertical growth
+
+        ext_rows = []
+        for combo, key_map in uncovered.items():
+            for key, vals in key_map.items():
+                for v in sorted(vals):
+                    for row in ext_rows:
+                        if ((row[i] < 0 or row[i] == v)
+                                and all(row[p] < 0 or row[p] == k for p, k in zip(combo, key))):
+                            break
+                    else:
+                        row = [-1] * (i+1)
+                        ext_rows.append(row)
+                    row[i] = v
+                    for p, k in zip(combo, key):
+                        row[p] = k
+
+        ## don't-care cells are filled by rotation before the next parameter
+
+        for r_idx, row in enumerate(ext_rows, start=len(rows)):
+            for p, v in enumerate(row):
+                if v < 0:
+                    row[p] = (r_idx + p) % dims[p]
+        rows.extend(ext_rows)
+
+    ## restore the parameter order
+
+    cover = []
+    for row in rows:
+        out = [0] * len(sizes)
+        for pos, v in enumerate(row):
+            out[order[pos]] = v
+        cover.append(tuple(out))
+    return cover
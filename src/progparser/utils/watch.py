@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+"""
+Polling file watcher
+"""
+
+import os
+
+
+class FileWatcher:
+    """Polling file watcher by (mtime, size) snapshot"""
+
+    def __init__(self, paths=()):
+        # stat_table = {path: (mtime_ns, size), ...}
+        self.stat_table = {}
+        self.update(paths)
+
+    def stat(self, path) -> tuple:
+        """Get the snapshot of a file (None if not existed)"""
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def update(self, paths):
+        """Reset the watched paths"""
+        self.stat_table = {path: self.stat_table.get(path, self.stat(path)) 
+                           for path in paths}
+
+    def poll(self) -> set:
+        """Get changed paths since the last poll"""
+        changed = set()
+        for path, last_st in self.stat_table.items():
+            if (cur_st := self.stat(path)) != last_st:
+                self.stat_table[path] = cur_st
+                changed.add(path)
+        return changed
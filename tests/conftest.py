@@ -0,0 +1,22 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+from pathlib import Path
+
+import pytest
+
+from progparser.progparser import PatternList
+
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent / 'example'
+
+
+@pytest.fixture
+def table_fp() -> str:
+    return str(EXAMPLE_DIR / 'reg_table.txt')
+
+
+@pytest.fixture
+def table(table_fp) -> PatternList:
+    return PatternList(table_fp, 'txt')
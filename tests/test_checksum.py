@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+import json
+from array import array
+
+import pytest
+
+from progparser.progparser import Pat
+from progparser.utils.checksum import (CHECKSUMS, SIDECAR, checksum, drop_sidecar,
+                                       parse_trailer, save_sidecar, sidecar_sum, trailer)
+
+WORDS = array('I', [0x0, 0x1, 0xdeadbeef, 0xffffffff, 0x12345678])
+
+
+@pytest.mark.parametrize('algo', CHECKSUMS)
+def test_trailer_round_trip(algo):
+    assert parse_trailer(trailer(WORDS, algo)) == (algo, checksum(WORDS, algo))
+
+
+def test_checksum_values():
+    assert checksum(array('I'), 'crc32') == 0
+    assert checksum(array('I'), 'crc16') == 0xffff
+    assert checksum(WORDS, 'sum') == sum(WORDS) & 0xffffffff
+    assert checksum(array('L', WORDS), 'crc32') == checksum(WORDS, 'crc32')
+    with pytest.raises(ValueError):
+        checksum(WORDS, 'md5')
+
+
+def test_parse_trailer_comment():
+    assert parse_trailer('// generated by progparser\n') is None
+    assert parse_trailer('// md5 0x1234\n') is None
+
+
+@pytest.fixture
+def dump(tmp_path, table):
+    table.pat_list = [Pat('pat0', {'GROUP1_VAR2_1': '0x10'}),
+                      Pat('pat1', {'GROUP2_VAR2_SIGNED': '-3'})]
+    return table
+
+
+@pytest.mark.parametrize('algo', CHECKSUMS)
+def test_hex_trailer_round_trip(tmp_path, dump, algo):
+    dump.hex_dump(tmp_path, is_force=True, info_dump=False, check_algo=algo)
+    for pat in dump.pat_list:
+        lines = (tmp_path / f"{pat.name}.pat").read_text().splitlines(True)
+        assert parse_trailer(lines[-1])[0] == algo
+        assert dump.hex_read(str(tmp_path / f"{pat.name}.pat")).name == pat.name
+    assert not (tmp_path / SIDECAR).exists()
+
+
+def test_hex_trailer_corrupted(tmp_path, dump):
+    dump.hex_dump(tmp_path, is_force=True, info_dump=False, check_algo='crc32')
+    hex_fp = tmp_path / 'pat0.pat'
+    lines = hex_fp.read_text().splitlines(True)
+    lines[0] = lines[0][:4] + f"{int(lines[0][4:12], 16) ^ 1:08x}" + lines[0][12:]
+    hex_fp.write_text(''.join(lines))
+    with pytest.raises(ValueError, match='ChecksumError'):
+        dump.hex_read(str(hex_fp))
+
+
+def test_hex_sidecar_round_trip(tmp_path, dump):
+    dump.hex_dump(tmp_path, is_force=True, info_dump=False, check_algo='crc16',
+                  is_sidecar=True)
+    manifest = json.loads((tmp_path / SIDECAR).read_text())
+    assert manifest['algo'] == 'crc16'
+    assert sorted(manifest['checksum']) == ['pat0.pat', 'pat1.pat']
+
+    hex_fp = tmp_path / 'pat1.pat'
+    assert '// crc16' not in hex_fp.read_text()
+    assert sidecar_sum(str(hex_fp))[0] == 'crc16'
+    dump.hex_read(str(hex_fp))
+
+    lines = hex_fp.read_text().splitlines(True)
+    lines[-1] = lines[-1][:4] + f"{int(lines[-1][4:12], 16) ^ 1:08x}" + lines[-1][12:]
+    hex_fp.write_text(''.join(lines))
+    with pytest.raises(ValueError, match='ChecksumError'):
+        dump.hex_read(str(hex_fp))
+
+    # Re-written without sidecar, the stale checksums are dropped
+    dump.hex_dump(tmp_path, is_force=True, info_dump=False)
+    assert json.loads((tmp_path / SIDECAR).read_text())['checksum'] == {}
+    dump.hex_read(str(hex_fp))
+
+
+def test_sidecar_merge_and_drop(tmp_path):
+    save_sidecar(tmp_path, 'crc32', {'a.pat': 1, 'b.pat': 2})
+    save_sidecar(tmp_path, 'crc32', {'b.pat': 3})
+    assert sidecar_sum(str(tmp_path / 'a.pat')) == ('crc32', 1)
+    assert sidecar_sum(str(tmp_path / 'b.pat')) == ('crc32', 3)
+
+    drop_sidecar(tmp_path, ['a.pat'])
+    assert sidecar_sum(str(tmp_path / 'a.pat')) is None
+    assert sidecar_sum(str(tmp_path / 'c.pat')) is None
+    drop_sidecar(tmp_path / 'none', ['a.pat'])
+
+
+def test_sidecar_algo_change(tmp_path, capsys):
+    save_sidecar(tmp_path, 'crc32', {'a.pat': 1, 'b.pat': 2})
+    save_sidecar(tmp_path, 'sum', {'b.pat': 5})
+    assert 'changed (crc32 -> sum), 1 checksums' in capsys.readouterr().out
+    manifest = json.loads((tmp_path / SIDECAR).read_text())
+    assert manifest == {'algo': 'sum', 'checksum': {'b.pat': '0x00000005'}}
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+import pytest
+
+from progparser.patverify import pack_pats
+from progparser.progparser import Pat
+from progparser.utils.pat_index import PatIndex
+
+
+def make_pats(start: int, end: int) -> list:
+    return [Pat(f"p{i}", {'GROUP1_VAR2_1': str(i*10), 'GROUP2_VAR2_SIGNED': str(i-2)})
+            for i in range(start, end)]
+
+
+@pytest.fixture
+def index(table) -> PatIndex:
+    index = PatIndex(PatIndex.table_layout(table))
+    index.update(pack_pats(table, 'hex', make_pats(0, 5)))
+    return index
+
+
+@pytest.mark.parametrize('expr, names', [
+    ('group1_var2_1 == 20', ['p2']),
+    ('GROUP1_VAR2_1 != 20', ['p0', 'p1', 'p3', 'p4']),
+    ('group1_var2_1 >= 20', ['p2', 'p3', 'p4']),
+    ('group1_var2_1 < 0x14', ['p0', 'p1']),
+    ('group2_var2_signed < 0', ['p0', 'p1']),
+    ('group2_var2_signed <= -1 || group1_var2_1 > 30', ['p0', 'p1', 'p4']),
+    ('group1_var2_1 >= 20 && !(group2_var2_signed == 2)', ['p2', 'p3']),
+    ('!(group1_var2_1 == 0 || group1_var2_1 == 40) && group2_var2_signed > -2', ['p1', 'p2', 'p3']),
+    ('group1_var1_2 == 1', ['p0', 'p1', 'p2', 'p3', 'p4']),
+    ('group1_var2_1 == 5', []),
+])
+def test_query(index, expr, names):
+    assert index.match(expr) == names
+
+
+def test_query_signed_hex(index):
+    assert index.match('group2_var2_signed == 0xffff') == ['p1']
+    assert index.match('group2_var2_signed == -0x2') == ['p0']
+    with pytest.raises(ValueError):
+        index.query('group2_var2_signed == 0x10000')
+
+
+@pytest.mark.parametrize('expr', [
+    'group1_var2_1 = 1',
+    'group1_var2_1 ==',
+    '(group1_var2_1 == 1',
+    'group1_var2_1 == 1)',
+    'group1_var2_1 == 1 &&',
+    'group1_var2_1 == abc',
+    'group1_var2_1 == 1 # x',
+])
+def test_query_syntax_error(index, expr):
+    with pytest.raises(SyntaxError):
+        index.query(expr)
+
+
+def test_query_unknown_field(index):
+    with pytest.raises(ValueError):
+        index.query('no_such_reg == 1')
+
+
+def test_reindex_and_remove(table, index):
+    index.update(pack_pats(table, 'hex', [Pat('p2', {'GROUP1_VAR2_1': '99'})]))
+    assert index.match('group1_var2_1 == 20') == []
+    assert index.match('group1_var2_1 == 99') == ['p2']
+
+    index.remove(['p0', 'p2'])
+    assert len(index) == 3
+    assert index.match('group1_var2_1 != 30') == ['p1', 'p4']
+    assert index.match('!(group1_var2_1 == 10)') == ['p3', 'p4']
+
+    index.update(pack_pats(table, 'hex', make_pats(5, 6)))
+    assert index.match('group1_var2_1 == 50') == ['p5']
+
+
+def test_save_load(tmp_path, index):
+    index_fp = tmp_path / 'pat.idx'
+    index.save(index_fp)
+    loaded = PatIndex.load(index_fp)
+    assert loaded.match('group2_var2_signed < 0') == index.match('group2_var2_signed < 0')
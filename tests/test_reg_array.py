@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+import pickle
+
+import pytest
+
+from progparser.progparser import PatternList
+from progparser.utils.reg_array import RegArray, RegView
+from progparser.utils.ref_table import Reg
+
+
+def all_regs(table) -> list:
+    return [reg for ini_grp in table.ini_table for reg in ini_grp.regs]
+
+
+def test_reg_records(table):
+    reg_array = RegArray.from_table(table)
+    regs = all_regs(table)
+    assert len(reg_array) == len(regs)
+    assert [reg_array[i] for i in range(len(reg_array))] == regs
+    assert [reg_array.view(i) for i in range(len(reg_array))] == regs
+
+
+def test_reg_array_pickle(table):
+    reg_array = pickle.loads(pickle.dumps(RegArray.from_table(table)))
+    assert [reg_array[i] for i in range(len(reg_array))] == all_regs(table)
+
+
+def test_reg_view_pickle(table):
+    reg_array = RegArray.from_table(table)
+    for i, reg in enumerate(all_regs(table)):
+        copy = pickle.loads(pickle.dumps(reg_array.view(i)))
+        assert type(copy) is Reg
+        assert copy == reg
+
+
+def test_buffer_round_trip(table):
+    buf = RegArray.from_table(table).to_buffer()
+    reg_array = RegArray.from_buffer(bytearray(buf))
+    assert [reg_array[i] for i in range(len(reg_array))] == all_regs(table)
+    with pytest.raises(ValueError):
+        RegArray.from_buffer(b'XXXX' + buf[4:])
+
+
+@pytest.mark.parametrize('is_lazy', [False, True])
+def test_to_table(table, is_lazy):
+    reg_array = RegArray.from_table(table)
+    copy = PatternList(reg_array, 'array')
+    if is_lazy:
+        reg_array.to_table(copy, is_lazy=True)
+        assert all(isinstance(reg, RegView) for reg in all_regs(copy))
+    assert copy.init_diff(table) == set()
+    assert copy.hex_out == table.hex_out
+    assert list(copy.reg_table) == list(table.reg_table)
+
+
+def test_wide_records(table):
+    reg = next(reg for reg in all_regs(table) if reg.type == 'reg')
+    reg.init_val = 1 << 70
+    reg.msb = 300
+    reg_array = RegArray.from_table(table)
+    reg_array = RegArray.from_buffer(reg_array.to_buffer())
+    rec_idx = all_regs(table).index(reg)
+    assert reg_array[rec_idx] == reg
+    assert reg_array.view(rec_idx).init_val == 1 << 70
+    assert reg_array.view(rec_idx).msb == 300
+
+
+def test_record_overflow(table):
+    reg = next(reg for reg in all_regs(table) if reg.type == 'reg')
+    reg.addr = 1 << 64
+    with pytest.raises(ValueError, match='TableParseError'):
+        RegArray.from_table(table)
+
+
+def test_table_db_round_trip(tmp_path, table):
+    db_fp = tmp_path / 'reg_table.db'
+    table.export_table_db(db_fp)
+    copy = PatternList(db_fp, 'db')
+    assert copy.init_diff(table) == set()
+    assert all_regs(copy) == all_regs(table)
+    assert copy.field_index.keys() == table.field_index.keys()
+
+
+def test_table_pickle(table):
+    copy = pickle.loads(pickle.dumps(table))
+    assert copy.init_diff(table) == set()
+    assert copy.field_index.keys() == table.field_index.keys()
+
+    reg_array = RegArray.from_table(table)
+    lazy = PatternList(reg_array, 'array')
+    reg_array.to_table(lazy, is_lazy=True)
+    copy = pickle.loads(pickle.dumps(lazy))
+    assert all(type(reg) is Reg for reg in all_regs(copy))
+    assert copy.init_diff(table) == set()
@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pytest
+
+from progparser.progparser import Pat, PatternList
+from progparser.utils.ref_table import Reg
+from progparser.utils.reg_array import RegView
+from progparser.utils.shared_table import SharedTable, attach_table
+
+PAT = Pat('pat0', {'GROUP1_VAR2_1': '0x10', 'GROUP2_VAR2_SIGNED': '-3'})
+
+
+def hex_words(handle: tuple) -> bytes:
+    """Pack the pattern with the attached table (worker side)"""
+    return PatternList(handle, 'shared').hex_words(PAT).tobytes()
+
+
+@pytest.fixture(params=['shm', 'mmap'])
+def shared(request, tmp_path, table):
+    mmap_fp = tmp_path / 'reg_table.buf' if request.param == 'mmap' else None
+    with SharedTable(table, mmap_fp) as shared:
+        yield shared
+
+
+def test_attach(table, shared):
+    reg_array = attach_table(shared.handle)
+    assert reg_array.owner is not None
+    assert [reg_array[i] for i in range(len(reg_array))] == \
+           [reg for ini_grp in table.ini_table for reg in ini_grp.regs]
+
+
+def test_shared_table(table, shared):
+    copy = PatternList(shared.handle, 'shared')
+    assert all(isinstance(reg, RegView) for ini_grp in copy.ini_table for reg in ini_grp.regs)
+    assert copy.init_diff(table) == set()
+    assert copy.hex_words(PAT) == table.hex_words(PAT)
+
+
+def test_shared_table_pickle(table, shared):
+    copy = pickle.loads(pickle.dumps(PatternList(shared.handle, 'shared')))
+    assert all(type(reg) is Reg for ini_grp in copy.ini_table for reg in ini_grp.regs)
+    assert copy.init_diff(table) == set()
+    assert pickle.loads(pickle.dumps(shared.handle)) == shared.handle
+
+
+def test_shared_table_workers(table, shared):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(hex_words, [shared.handle] * 4))
+    assert results == [table.hex_words(PAT).tobytes()] * 4
+
+
+def test_close(table):
+    shared = SharedTable(table)
+    name = shared.handle[1]
+    shared.close()
+    shared.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright (C) 2022 Yeh, Hsin-Hsien <yhh76227@gmail.com>
+#
+
+import itertools
+import random
+
+import pytest
+
+from progparser.utils.sweep import Sweep, covering_array
+
+
+def uncovered(rows: list, sizes: list, strength: int) -> list:
+    """List t-wise value combinations not covered by the rows"""
+    missing = []
+    for combo in itertools.combinations(range(len(sizes)), strength):
+        seen = {tuple(row[p] for p in combo) for row in rows}
+        for key in itertools.product(*[range(sizes[p]) for p in combo]):
+            if key not in seen:
+                missing.append((combo, key))
+    return missing
+
+
+@pytest.mark.parametrize('sizes, strength', [
+    ([2, 2, 2], 2),
+    ([3, 3, 3, 3], 2),
+    ([4, 2, 3, 5, 2], 2),
+    ([3, 3, 3, 3, 3], 3),
+    ([2] * 10, 2),
+])
+def test_covering_array_full_coverage(sizes, strength):
+    rows = covering_array(sizes, strength)
+    assert not uncovered(rows, sizes, strength)
+    assert all(0 <= v < sizes[p] for row in rows for p, v in enumerate(row))
+
+
+def test_covering_array_random_configs():
+    rng = random.Random(1)
+    for _ in range(50):
+        sizes = [rng.randint(1, 4) for _ in range(rng.randint(1, 6))]
+        strength = rng.randint(1, 3)
+        rows = covering_array(sizes, strength)
+        assert not uncovered(rows, sizes, min(strength, len(sizes)))
+
+
+def test_covering_array_smaller_than_product():
+    sizes = [3] * 6
+    rows = covering_array(sizes, 2)
+    assert 9 <= len(rows) < 3 ** 6
+
+
+def test_covering_array_degenerate():
+    assert covering_array([], 2) == []
+    assert covering_array([3, 0, 2], 2) == []
+    assert sorted(covering_array([2, 3], 4)) == sorted(itertools.product(range(2), range(3)))
+
+
+def test_nwise_sweep_values():
+    sweep = Sweep.nwise('plan', strength=2, reg_a=[10, 20, 30], reg_b=['x', 'y'],
+                        reg_c=[0, 1])
+    pats = list(sweep)
+    assert pats[0][0] == 'plan-0'
+    pairs = {(regs['reg_a'], regs['reg_b']) for _, regs in pats}
+    assert pairs == set(itertools.product([10, 20, 30], ['x', 'y']))
+
+
+def test_sweep_filter_sees_fixed_registers():
+    sweep = (Sweep.product('plan', reg_a=range(3))
+             .where(lambda regs: regs['reg_a'] != regs['reg_c'])
+             .fix(reg_c=1))
+    assert [regs for _, regs in sweep] == [{'reg_a': 0, 'reg_c': 1},
+                                           {'reg_a': 2, 'reg_c': 1}]